@@ -0,0 +1,63 @@
+"""
+Catalog Models
+Compact records for stream list entries returned by the Xtream API.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Stream:
+    """Live, VOD or series list entry holding only the fields the UI reads"""
+
+    name: Optional[str] = None
+    category_id: Optional[str] = None
+    stream_id: Optional[int] = None
+    series_id: Optional[int] = None
+    stream_icon: Optional[str] = None
+    epg_channel_id: Optional[str] = None
+    plot: Optional[str] = None
+    genre: Optional[str] = None
+    release_date: Optional[str] = None
+    rating: Optional[str] = None
+    container_extension: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Stream":
+        """Build from a raw API entry, normalizing live/VOD/series key differences"""
+        category_id = data.get("category_id")
+        return cls(
+            name=data.get("name"),
+            category_id=str(category_id) if category_id is not None else None,
+            stream_id=data.get("stream_id"),
+            series_id=data.get("series_id"),
+            stream_icon=data.get("stream_icon") or data.get("cover"),
+            epg_channel_id=data.get("epg_channel_id") or None,
+            plot=data.get("plot") or None,
+            genre=data.get("genre") or None,
+            release_date=data.get("release_date") or data.get("releaseDate") or None,
+            rating=data.get("rating") or None,
+            container_extension=data.get("container_extension") or None,
+        )
+
+    # Dict-style access, so code written against raw API entries keeps working.
+    # Unset fields behave like missing keys.
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in _STREAM_FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+_STREAM_FIELDS = frozenset(field.name for field in fields(Stream))
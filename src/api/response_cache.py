@@ -0,0 +1,98 @@
+"""
+Response Cache
+Persists raw Xtream API responses on disk with per-entry expiry.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    fresh: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class ResponseCache:
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                body BLOB NOT NULL,
+                expires REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+            """
+        )
+
+    def _execute(self, sql: str, args: tuple = ()) -> Optional[tuple]:
+        """Run a single statement on a short-lived connection"""
+        with self._lock:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                with conn:
+                    return conn.execute(sql, args).fetchone()
+            finally:
+                conn.close()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get a cached response, fresh or stale"""
+        try:
+            row = self._execute(
+                "SELECT body, expires, etag, last_modified FROM responses WHERE key = ?",
+                (key,),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to read response cache: {e}")
+            return None
+
+        if not row:
+            return None
+
+        body, expires, etag, last_modified = row
+        return CacheEntry(bytes(body), expires > time.time(), etag, last_modified)
+
+    def set(
+        self,
+        key: str,
+        scope: str,
+        body: bytes,
+        ttl: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        """Store a response that stays fresh for ttl seconds"""
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, body, time.time() + ttl, etag, last_modified),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to write response cache: {e}")
+
+    def touch(self, key: str, ttl: float):
+        """Mark a revalidated response fresh for another ttl seconds"""
+        try:
+            self._execute(
+                "UPDATE responses SET expires = ? WHERE key = ?",
+                (time.time() + ttl, key),
+            )
+        except sqlite3.Error as e:
+            print(f"Failed to write response cache: {e}")
+
+    def expire(self, scope: str):
+        """Mark every response in scope stale so it is revalidated on next use"""
+        try:
+            self._execute("UPDATE responses SET expires = 0 WHERE scope = ?", (scope,))
+        except sqlite3.Error as e:
+            print(f"Failed to write response cache: {e}")
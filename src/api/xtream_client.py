@@ -3,27 +3,215 @@ Xtream Codes API Client
 Handles authentication and data fetching from Xtream Codes servers.
 """
 
-import requests
-from typing import Dict, List, Optional, Union
-from urllib.parse import urljoin
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
 import json
 
+from .models import Stream
+from .response_cache import ResponseCache
+from utils.json_compat import loads
+from utils.settings import settings
+
+
+# Catalog keys mapped to the client method that fetches them
+CATALOG_ENDPOINTS = {
+    "live_categories": "get_live_categories",
+    "vod_categories": "get_vod_categories",
+    "series_categories": "get_series_categories",
+    "live_streams": "get_live_streams",
+    "vod_streams": "get_vod_streams",
+    "series": "get_series",
+}
+
+# Actions whose responses are stream lists rather than plain dicts
+STREAM_LIST_ACTIONS = frozenset(["get_live_streams", "get_vod_streams", "get_series"])
+
+# Actions that answer with a JSON array; anything else from them is an error reply
+LIST_ACTIONS = STREAM_LIST_ACTIONS | {
+    "get_live_categories",
+    "get_vod_categories",
+    "get_series_categories",
+}
+
+# Seconds a cached response stays fresh before it is revalidated with the server
+CACHE_TTLS = {
+    "get_live_categories": 24 * 3600,
+    "get_vod_categories": 24 * 3600,
+    "get_series_categories": 24 * 3600,
+    "get_live_streams": 6 * 3600,
+    "get_vod_streams": 6 * 3600,
+    "get_series": 6 * 3600,
+    "get_vod_info": 24 * 3600,
+    "get_series_info": 24 * 3600,
+}
+
+# Many panels reject the default python-requests agent, so present as a player
+USER_AGENT = "VLC/3.0.14 LibVLC/3.0.14"
+
+# File extension used for each playback stream type
+STREAM_EXTENSIONS = {"live": "ts", "movie": "mp4", "series": "mp4"}
+
+
+def _array_items(data) -> List:
+    """Get the items of a decoded array response, or nothing for other payloads"""
+    return data if isinstance(data, list) else []
+
+
+def cached_method(fn):
+    """Memoize a client method per instance; empty or failed results are not kept"""
+    attr = f"_memo_{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        memo = self.__dict__.setdefault(attr, {})
+        if key in memo:
+            return memo[key]
+        result = fn(self, *args, **kwargs)
+        if result:
+            memo[key] = result
+        return result
+
+    return wrapper
+
 
 class XtreamCodesClient:
-    def __init__(self, server_url: str, username: str, password: str):
+    def __init__(
+        self,
+        server_url: str,
+        username: str,
+        password: str,
+        cache: Optional[ResponseCache] = None,
+    ):
         self.server_url = server_url.rstrip("/")
         self.username = username
         self.password = password
-        self.session = requests.Session()
         self.player_api_url = f"{self.server_url}/player_api.php"
 
+        # Credentials are percent-encoded once; every URL getter reuses these
+        credentials_path = f"{quote(username, safe='')}/{quote(password, safe='')}"
+        self._stream_url_prefixes = {
+            stream_type: f"{self.server_url}/{stream_type}/{credentials_path}/"
+            for stream_type in STREAM_EXTENSIONS
+        }
+        auth_query = urlencode({"username": username, "password": password})
+        self._xmltv_url = f"{self.server_url}/xmltv.php?{auth_query}"
+        self._m3u_url = f"{self.server_url}/get.php?{auth_query}&type=m3u_plus&output=ts"
+        self.cache = cache or ResponseCache(
+            settings.settings_dir / "cache" / "api_responses.sqlite3"
+        )
+        # The password hash keeps replies cached under wrong credentials from
+        # being served once the password is corrected
+        password_hash = hashlib.blake2b(password.encode(), digest_size=8)
+        self._cache_scope = (
+            f"{self.username}:{password_hash.hexdigest()}@{self.server_url}"
+        )
+        # Connection limit reported by the server, once get_server_info has run
+        self.max_connections = None
+
+    @cached_property
+    def session(self):
+        """HTTP session, created on first use to keep requests off the startup path"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        # All endpoints share one host, so keep connections alive and retry
+        # transient gateway errors instead of failing the call outright
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=frozenset(["GET"]),
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Accept-Encoding"] = "gzip"
+        session.headers["User-Agent"] = USER_AGENT
+        # Merged into every request by requests, so callers' params stay untouched
+        session.params = {"username": self.username, "password": self.password}
+        return session
+
+    def close(self):
+        """Close pooled connections; a later request opens a new session"""
+        session = self.__dict__.pop("session", None)
+        if session is not None:
+            session.close()
+
+    def _cache_key(self, params: Dict) -> str:
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(
+            f"{self._cache_scope}|{payload}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _cache_lookup(self, params: Dict):
+        """Get the ttl, cache key and cached entry for a request, if it is cacheable"""
+        ttl = CACHE_TTLS.get(params.get("action"))
+        if ttl is None:
+            return None, None, None
+        cache_key = self._cache_key(params)
+        return ttl, cache_key, self.cache.get(cache_key)
+
+    def _send(self, params: Dict, entry):
+        """Send an API request, revalidating a cached entry if one is given"""
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        return self.session.get(
+            self.player_api_url,
+            params=params,
+            headers=headers,
+            timeout=30,
+        )
+
+    def _store(self, cache_key: str, ttl: float, response, body: bytes):
+        self.cache.set(
+            cache_key,
+            self._cache_scope,
+            body,
+            ttl,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
     def _make_request(self, params: Dict) -> Optional[Dict]:
         """Make API request with error handling"""
+        import requests
+
+        ttl, cache_key, entry = self._cache_lookup(params)
+        if entry and entry.fresh:
+            try:
+                return loads(entry.body)
+            except json.JSONDecodeError:
+                entry = None
+
         try:
-            params.update({"username": self.username, "password": self.password})
-            response = self.session.get(self.player_api_url, params=params, timeout=30)
+            response = self._send(params, entry)
+            if entry and response.status_code == 304:
+                self.cache.touch(cache_key, ttl)
+                return loads(entry.body)
+
             response.raise_for_status()
-            return response.json()
+            data = loads(response.content)
+            cacheable = data and (
+                params.get("action") not in LIST_ACTIONS or isinstance(data, list)
+            )
+            if cache_key and cacheable:
+                self._store(cache_key, ttl, response, response.content)
+            return data
         except requests.exceptions.RequestException as e:
             print(f"API request failed: {e}")
             return None
@@ -31,73 +219,187 @@ class XtreamCodesClient:
             print("Invalid JSON response from server")
             return None
 
+    def _fetch_streams(self, params: Dict) -> List[Stream]:
+        """Fetch a stream list endpoint, converting its entries to Stream records"""
+        # The whole body is decoded in one C pass; it is held in full for the
+        # cache anyway, so decoding while it downloads would not save memory
+        data = self._make_request(params)
+        return [Stream.from_dict(item) for item in _array_items(data)]
+
+    def cached_catalog(self) -> Tuple[Dict[str, List], bool]:
+        """Get the catalog from cached responses only, and whether all are fresh
+
+        The catalog is empty unless every endpoint has a cached response.
+        """
+        catalog = {}
+        fresh = True
+        for key, action in CATALOG_ENDPOINTS.items():
+            entry = self.cache.get(self._cache_key({"action": action}))
+            if entry is None:
+                return {}, False
+            try:
+                items = _array_items(loads(entry.body))
+            except json.JSONDecodeError:
+                return {}, False
+            if action in STREAM_LIST_ACTIONS:
+                items = [Stream.from_dict(item) for item in items]
+            catalog[key] = items
+            fresh = fresh and entry.fresh
+        return catalog, fresh
+
+    def expire_cache(self):
+        """Force cached responses for this account to be revalidated"""
+        self.cache.expire(self._cache_scope)
+        for attr, memo in self.__dict__.items():
+            if attr.startswith("_memo_"):
+                memo.clear()
+
+    def _worker_count(self, max_workers: int, jobs: int) -> int:
+        """Number of worker threads to use, within the account's connection limit"""
+        if self.max_connections:
+            max_workers = min(max_workers, self.max_connections)
+        return max(1, min(max_workers, jobs))
+
     def get_server_info(self) -> Optional[Dict]:
         """Get server information and user details"""
-        return self._make_request({})
+        data = self._make_request({})
+        if isinstance(data, dict):
+            user_info = data.get("user_info") or {}
+            try:
+                limit = int(user_info.get("max_connections") or 0)
+            except (TypeError, ValueError):
+                limit = 0
+            self.max_connections = limit if limit > 0 else None
+        return data
 
+    @cached_method
     def get_live_categories(self) -> List[Dict]:
         """Get live TV categories"""
         data = self._make_request({"action": "get_live_categories"})
-        return data if data else []
+        return _array_items(data)
 
+    @cached_method
     def get_vod_categories(self) -> List[Dict]:
         """Get VOD (Movies) categories"""
         data = self._make_request({"action": "get_vod_categories"})
-        return data if data else []
+        return _array_items(data)
 
+    @cached_method
     def get_series_categories(self) -> List[Dict]:
         """Get Series categories"""
         data = self._make_request({"action": "get_series_categories"})
-        return data if data else []
+        return _array_items(data)
 
-    def get_live_streams(self, category_id: Optional[int] = None) -> List[Dict]:
+    def get_live_streams(self, category_id: Optional[int] = None) -> List[Stream]:
         """Get live TV streams"""
         params = {"action": "get_live_streams"}
         if category_id:
             params["category_id"] = category_id
-        data = self._make_request(params)
-        return data if data else []
+        return self._fetch_streams(params)
 
-    def get_vod_streams(self, category_id: Optional[int] = None) -> List[Dict]:
+    def get_vod_streams(self, category_id: Optional[int] = None) -> List[Stream]:
         """Get VOD streams"""
         params = {"action": "get_vod_streams"}
         if category_id:
             params["category_id"] = category_id
-        data = self._make_request(params)
-        return data if data else []
+        return self._fetch_streams(params)
 
-    def get_series(self, category_id: Optional[int] = None) -> List[Dict]:
+    def get_series(self, category_id: Optional[int] = None) -> List[Stream]:
         """Get series"""
         params = {"action": "get_series"}
         if category_id:
             params["category_id"] = category_id
-        data = self._make_request(params)
-        return data if data else []
+        return self._fetch_streams(params)
 
+    @cached_method
     def get_series_info(self, series_id: int) -> Optional[Dict]:
         """Get detailed series information including episodes"""
         return self._make_request({"action": "get_series_info", "series_id": series_id})
 
+    @cached_method
     def get_vod_info(self, vod_id: int) -> Optional[Dict]:
         """Get detailed VOD information"""
         return self._make_request({"action": "get_vod_info", "vod_id": vod_id})
 
+    def iter_catalog(
+        self,
+        keys: Optional[Iterable[str]] = None,
+        max_workers: int = 6,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Tuple[str, List]]:
+        """Fetch catalog endpoints concurrently, yielding (key, result) as each lands
+
+        Once should_stop returns True, endpoints not yet started are skipped and
+        nothing more is yielded.
+        """
+        keys = list(keys) if keys is not None else list(CATALOG_ENDPOINTS)
+        if not keys:
+            return
+
+        def fetch(key):
+            if should_stop is not None and should_stop():
+                return None
+            return getattr(self, CATALOG_ENDPOINTS[key])()
+
+        # Build the shared session before worker threads race to create it
+        self.session
+
+        workers = self._worker_count(max_workers, len(keys))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {executor.submit(fetch, key): key for key in keys}
+            for future in as_completed(futures):
+                if should_stop is not None and should_stop():
+                    return
+                yield futures[future], future.result()
+        finally:
+            # A caller that stops early abandons the endpoints not yet started
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_all_catalog(
+        self, keys: Optional[Iterable[str]] = None, max_workers: int = 6
+    ) -> Dict[str, List]:
+        """Fetch catalog endpoints concurrently so latency is the slowest call, not the sum"""
+        return dict(self.iter_catalog(keys, max_workers))
+
+    def _fetch_batch(self, fetch, ids: Iterable[int], max_workers: int) -> Dict:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+
+        # Build the shared session before worker threads race to create it
+        self.session
+
+        workers = self._worker_count(max_workers, len(ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {item_id: executor.submit(fetch, item_id) for item_id in ids}
+            return {item_id: future.result() for item_id, future in futures.items()}
+
+    def get_series_info_batch(
+        self, series_ids: Iterable[int], max_workers: int = 8
+    ) -> Dict[int, Optional[Dict]]:
+        """Get series information for several series concurrently"""
+        return self._fetch_batch(self.get_series_info, series_ids, max_workers)
+
+    def get_vod_info_batch(
+        self, vod_ids: Iterable[int], max_workers: int = 8
+    ) -> Dict[int, Optional[Dict]]:
+        """Get VOD information for several movies concurrently"""
+        return self._fetch_batch(self.get_vod_info, vod_ids, max_workers)
+
     def get_xmltv_url(self) -> str:
         """Get XMLTV EPG URL"""
-        return f"{self.server_url}/xmltv.php?username={self.username}&password={self.password}"
+        return self._xmltv_url
 
     def get_m3u_url(self) -> str:
         """Get M3U playlist URL"""
-        return f"{self.server_url}/get.php?username={self.username}&password={self.password}&type=m3u_plus&output=ts"
+        return self._m3u_url
 
-    def get_stream_url(self, stream_id: int, stream_type: str = "live") -> str:
-        """Generate stream URL for playback"""
-        if stream_type == "live":
-            return (
-                f"{self.server_url}/live/{self.username}/{self.password}/{stream_id}.ts"
-            )
-        elif stream_type == "movie":
-            return f"{self.server_url}/movie/{self.username}/{self.password}/{stream_id}.mp4"
-        elif stream_type == "series":
-            return f"{self.server_url}/series/{self.username}/{self.password}/{stream_id}.mp4"
-        return ""
+    def get_stream_url(
+        self, stream_id: int, stream_type: str = "live", extension: Optional[str] = None
+    ) -> str:
+        """Generate stream URL for playback, in the given container if known"""
+        prefix = self._stream_url_prefixes.get(stream_type)
+        if not prefix:
+            return ""
+        return f"{prefix}{stream_id}.{extension or STREAM_EXTENSIONS[stream_type]}"
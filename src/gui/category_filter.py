@@ -2,6 +2,8 @@
 Category Filter Widget for dynamic subcategory filtering
 """
 
+from contextlib import contextmanager
+
 from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -9,14 +11,27 @@ from PyQt6.QtWidgets import (
     QLabel,
     QComboBox,
     QCheckBox,
-    QScrollArea,
     QGroupBox,
     QPushButton,
     QLineEdit,
     QListWidget,
     QListWidgetItem,
+    QAbstractItemView,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+
+
+@contextmanager
+def _batch_updates(view):
+    """Suspend signals and repaints of an item view, repainting once at the end"""
+    view.setUpdatesEnabled(False)
+    view.blockSignals(True)
+    try:
+        yield view
+    finally:
+        view.blockSignals(False)
+        view.setUpdatesEnabled(True)
+        view.viewport().update()
 
 
 class CategoryFilterWidget(QWidget):
@@ -26,7 +41,17 @@ class CategoryFilterWidget(QWidget):
         super().__init__()
         self.content_type = content_type
         self.categories = categories or []
+        self._sorted_categories = tuple(sorted(set(self.categories)))
         self.active_filters = {}
+        self.category_checkboxes = {}
+        self._filter_update_pending = False
+
+        # Coalesce keystrokes so filters are emitted once typing pauses
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.on_filter_changed)
+
         self.init_ui()
 
     def init_ui(self):
@@ -43,7 +68,7 @@ class CategoryFilterWidget(QWidget):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search content...")
-        self.search_input.textChanged.connect(self.on_filter_changed)
+        self.search_input.textChanged.connect(self._search_timer.start)
         search_layout.addWidget(self.search_input)
 
         layout.addWidget(search_group)
@@ -59,21 +84,18 @@ class CategoryFilterWidget(QWidget):
             self.all_categories_cb.stateChanged.connect(self.on_all_categories_changed)
             category_layout.addWidget(self.all_categories_cb)
 
-            # Individual category checkboxes in scrollable area
-            scroll_area = QScrollArea()
-            scroll_widget = QWidget()
-            scroll_layout = QVBoxLayout(scroll_widget)
+            # Individual categories as checkable items in a single list widget
+            self.category_list = QListWidget()
+            self.category_list.setSelectionMode(
+                QAbstractItemView.SelectionMode.NoSelection
+            )
+            self.category_list.setMaximumHeight(200)
 
-            self.category_checkboxes = {}
-            for category in sorted(self.categories):
-                cb = QCheckBox(category)
-                cb.stateChanged.connect(self.on_category_changed)
-                scroll_layout.addWidget(cb)
-                self.category_checkboxes[category] = cb
+            for category in self._sorted_categories:
+                self.add_category_item(category)
 
-            scroll_area.setWidget(scroll_widget)
-            scroll_area.setMaximumHeight(200)
-            category_layout.addWidget(scroll_area)
+            self.category_list.itemChanged.connect(self.on_category_changed)
+            category_layout.addWidget(self.category_list)
 
             layout.addWidget(category_group)
 
@@ -127,7 +149,7 @@ class CategoryFilterWidget(QWidget):
                 "Crime",
             ]
         )
-        self.genre_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.genre_combo.currentTextChanged.connect(self._schedule_filter_update)
         genre_layout.addWidget(self.genre_combo)
         movie_layout.addLayout(genre_layout)
 
@@ -137,13 +159,13 @@ class CategoryFilterWidget(QWidget):
         self.year_combo = QComboBox()
         years = ["All Years"] + [str(year) for year in range(2024, 1970, -1)]
         self.year_combo.addItems(years)
-        self.year_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.year_combo.currentTextChanged.connect(self._schedule_filter_update)
         year_layout.addWidget(self.year_combo)
         movie_layout.addLayout(year_layout)
 
         # Rating filter
         self.hd_only_cb = QCheckBox("HD Quality Only")
-        self.hd_only_cb.stateChanged.connect(self.on_filter_changed)
+        self.hd_only_cb.stateChanged.connect(self._schedule_filter_update)
         movie_layout.addWidget(self.hd_only_cb)
 
         layout.addWidget(movie_group)
@@ -160,7 +182,7 @@ class CategoryFilterWidget(QWidget):
         self.status_combo.addItems(
             ["All Status", "Ongoing", "Completed", "New Episodes"]
         )
-        self.status_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.status_combo.currentTextChanged.connect(self._schedule_filter_update)
         status_layout.addWidget(self.status_combo)
         series_layout.addLayout(status_layout)
 
@@ -182,7 +204,7 @@ class CategoryFilterWidget(QWidget):
                 "Kids",
             ]
         )
-        self.series_genre_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.series_genre_combo.currentTextChanged.connect(self._schedule_filter_update)
         genre_layout.addWidget(self.series_genre_combo)
         series_layout.addLayout(genre_layout)
 
@@ -211,7 +233,7 @@ class CategoryFilterWidget(QWidget):
                 "Local",
             ]
         )
-        self.channel_type_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.channel_type_combo.currentTextChanged.connect(self._schedule_filter_update)
         type_layout.addWidget(self.channel_type_combo)
         live_layout.addLayout(type_layout)
 
@@ -233,37 +255,52 @@ class CategoryFilterWidget(QWidget):
                 "Chinese",
             ]
         )
-        self.language_combo.currentTextChanged.connect(self.on_filter_changed)
+        self.language_combo.currentTextChanged.connect(self._schedule_filter_update)
         lang_layout.addWidget(self.language_combo)
         live_layout.addLayout(lang_layout)
 
         # Quality filter
         self.hd_channels_cb = QCheckBox("HD Channels Only")
-        self.hd_channels_cb.stateChanged.connect(self.on_filter_changed)
+        self.hd_channels_cb.stateChanged.connect(self._schedule_filter_update)
         live_layout.addWidget(self.hd_channels_cb)
 
         self.favorites_only_cb = QCheckBox("Favorites Only")
-        self.favorites_only_cb.stateChanged.connect(self.on_filter_changed)
+        self.favorites_only_cb.stateChanged.connect(self._schedule_filter_update)
         live_layout.addWidget(self.favorites_only_cb)
 
         layout.addWidget(live_group)
 
+    def add_category_item(self, category, row=None):
+        """Add a checkable category item to the category list"""
+        item = QListWidgetItem(category)
+        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+        item.setCheckState(Qt.CheckState.Unchecked)
+        if row is None:
+            self.category_list.addItem(item)
+        else:
+            self.category_list.insertItem(row, item)
+        self.category_checkboxes[category] = item
+
     def on_all_categories_changed(self, state):
         """Handle all categories checkbox change"""
         is_checked = state == Qt.CheckState.Checked.value
+        check_state = Qt.CheckState.Checked if is_checked else Qt.CheckState.Unchecked
 
-        for cb in self.category_checkboxes.values():
-            cb.blockSignals(True)
-            cb.setChecked(is_checked)
-            cb.blockSignals(False)
+        with _batch_updates(self.category_list):
+            for item in self.category_checkboxes.values():
+                item.setCheckState(check_state)
 
-        self.on_filter_changed()
+        self._schedule_filter_update()
 
     def on_category_changed(self):
         """Handle individual category checkbox change"""
         # Check if all categories are selected
-        all_checked = all(cb.isChecked() for cb in self.category_checkboxes.values())
-        any_checked = any(cb.isChecked() for cb in self.category_checkboxes.values())
+        checked = [
+            item.checkState() == Qt.CheckState.Checked
+            for item in self.category_checkboxes.values()
+        ]
+        all_checked = all(checked)
+        any_checked = any(checked)
 
         self.all_categories_cb.blockSignals(True)
         if all_checked:
@@ -274,15 +311,28 @@ class CategoryFilterWidget(QWidget):
             self.all_categories_cb.setCheckState(Qt.CheckState.PartiallyChecked)
         self.all_categories_cb.blockSignals(False)
 
-        self.on_filter_changed()
+        self._schedule_filter_update()
+
+    def _schedule_filter_update(self):
+        """Queue one filter emission for the end of the current event-loop turn"""
+        if not self._filter_update_pending:
+            self._filter_update_pending = True
+            QTimer.singleShot(0, self._flush_filter_update)
+
+    def _flush_filter_update(self):
+        # Skip if an immediate emission already went out this turn
+        if self._filter_update_pending:
+            self.on_filter_changed()
 
     def on_filter_changed(self):
         """Collect and emit current filter state"""
+        self._search_timer.stop()
+        self._filter_update_pending = False
         filters = {"search": self.search_input.text().strip(), "categories": []}
 
         # Get selected categories
-        for category, cb in self.category_checkboxes.items():
-            if cb.isChecked():
+        for category, item in self.category_checkboxes.items():
+            if item.checkState() == Qt.CheckState.Checked:
                 filters["categories"].append(category)
 
         # Add content-specific filters
@@ -350,11 +400,22 @@ class CategoryFilterWidget(QWidget):
         """Update available categories"""
         self.categories = categories
 
-        # Clear existing category checkboxes
-        for cb in self.category_checkboxes.values():
-            cb.deleteLater()
-        self.category_checkboxes.clear()
-
-        # Add new category checkboxes
-        # This would require rebuilding the UI section - simplified for now
-        pass
+        new_sorted = tuple(sorted(set(categories)))
+        if new_sorted == self._sorted_categories:
+            return
+
+        old_sorted = self._sorted_categories
+        self._sorted_categories = new_sorted
+        if not hasattr(self, "category_list"):
+            # The category section is only built when categories were given
+            return
+
+        # Only touch items that were added or removed, keeping check states
+        with _batch_updates(self.category_list):
+            for category in set(old_sorted).difference(new_sorted):
+                item = self.category_checkboxes.pop(category)
+                self.category_list.takeItem(self.category_list.row(item))
+
+            for row, category in enumerate(new_sorted):
+                if category not in self.category_checkboxes:
+                    self.add_category_item(category, row)
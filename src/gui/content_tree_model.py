@@ -0,0 +1,159 @@
+"""
+Content Tree Model for the Live TV / Movies / Series navigation tree
+"""
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+# Section title, catalog key holding its categories, and the item type
+# reported for its category rows
+SECTIONS = (
+    ("Live TV", "live_categories", "live_category"),
+    ("Movies", "vod_categories", "vod_category"),
+    ("Series", "series_categories", "series_category"),
+)
+
+
+class ContentNode:
+    __slots__ = ("name", "parent", "children", "pending", "data", "item_type")
+
+    def __init__(self, name, parent=None, data=None, item_type=None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        # Raw categories not yet turned into child nodes
+        self.pending = []
+        self.data = data
+        self.item_type = item_type
+
+
+class ContentTreeModel(QAbstractItemModel):
+    """Tree model that only creates category rows once a section is expanded"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = ContentNode("Content")
+        self._sections = {}
+        for name, data_key, item_type in SECTIONS:
+            section = ContentNode(name, self._root, item_type=item_type)
+            self._root.children.append(section)
+            self._sections[data_key] = section
+
+    def set_catalog(self, data):
+        """Update all sections; ones already expanded are diffed by category id"""
+        for row, (data_key, section) in enumerate(self._sections.items()):
+            categories = data.get(data_key, [])
+            if section.children:
+                self._update_section(self.index(row, 0), section, categories)
+            else:
+                # Not expanded yet, so rows are still created lazily on expand
+                section.pending = list(categories)
+                section_index = self.index(row, 0)
+                self.dataChanged.emit(section_index, section_index)
+
+    def _update_section(self, parent, section, categories):
+        """Remove, rename and append category rows so existing rows keep their state"""
+        by_id = {}
+        for category in categories:
+            by_id.setdefault(category.get("category_id"), category)
+
+        for row in range(len(section.children) - 1, -1, -1):
+            if section.children[row].data["category_id"] not in by_id:
+                self.beginRemoveRows(parent, row, row)
+                del section.children[row]
+                self.endRemoveRows()
+
+        for row, node in enumerate(section.children):
+            category = by_id.pop(node.data["category_id"], None)
+            if category is None:
+                continue  # A repeated id; its first row took the update
+            node.data["data"] = category
+            name = category.get("category_name", "Unknown")
+            if name != node.name:
+                node.name = name
+                index = self.index(row, 0, parent)
+                self.dataChanged.emit(index, index)
+
+        if by_id:
+            first = len(section.children)
+            self.beginInsertRows(parent, first, first + len(by_id) - 1)
+            section.children.extend(
+                self._category_node(category, section) for category in by_id.values()
+            )
+            self.endInsertRows()
+
+    @staticmethod
+    def _category_node(category, section):
+        return ContentNode(
+            category.get("category_name", "Unknown"),
+            section,
+            {
+                "type": section.item_type,
+                "category_id": category.get("category_id"),
+                "data": category,
+            },
+        )
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.parent.children.index(parent), 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        return bool(node.children or node.pending)
+
+    def canFetchMore(self, parent):
+        return bool(self._node(parent).pending)
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        pending, node.pending = node.pending, []
+        if not pending:
+            return
+
+        first = len(node.children)
+        self.beginInsertRows(parent, first, first + len(pending) - 1)
+        node.children.extend(
+            self._category_node(category, node) for category in pending
+        )
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.UserRole:
+            return node.data
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self._root.name
+        return None
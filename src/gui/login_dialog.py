@@ -12,7 +12,52 @@ from PyQt6.QtWidgets import (
     QLabel,
     QGroupBox,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from api.fetch_worker import FetchWorker
+from api.xtream_client import CATALOG_ENDPOINTS, XtreamCodesClient
+
+# Categories are small and always needed first, so they are worth fetching
+# while the dialog closes and the main window starts its loader thread
+PREFETCH_KEYS = ("live_categories", "vod_categories", "series_categories")
+
+
+def _start_prefetch(client: XtreamCodesClient) -> Future:
+    """Fetch PREFETCH_KEYS on Qt's global pool, one worker per key
+
+    The returned future settles with a dict of results once every key is done;
+    a key whose fetch raised is left out, so the loader fetches it again.
+    Qt pool threads are used rather than a Python executor, whose threads the
+    interpreter joins at exit even while a stalled request is still retrying.
+    """
+    future = Future()
+    results = {}
+    pending = [len(PREFETCH_KEYS)]
+    lock = threading.Lock()
+
+    def fetch(key):
+        try:
+            result = getattr(client, CATALOG_ENDPOINTS[key])()
+        except Exception as e:
+            print(f"Catalog prefetch failed: {e}")
+            result = None
+        with lock:
+            if result is not None:
+                results[key] = result
+            pending[0] -= 1
+            if pending[0]:
+                return
+        future.set_result(results)
+
+    # Build the shared session before pool threads race to create it
+    client.session
+    pool = QThreadPool.globalInstance()
+    for key in PREFETCH_KEYS:
+        pool.start(FetchWorker(fetch, key))
+    return future
 
 
 class LoginDialog(QDialog):
@@ -21,6 +66,8 @@ class LoginDialog(QDialog):
         self.setWindowTitle("Connect to IPTV Server")
         self.setModal(True)
         self.setFixedSize(400, 250)
+        self._client = None
+        self._prefetch_future = None
         self.init_ui()
 
     def init_ui(self):
@@ -83,4 +130,17 @@ class LoginDialog(QDialog):
         if not all(credentials.values()):
             return  # Don't accept if any field is empty
 
+        # Overlap the first catalog round-trips with dialog teardown
+        self._client = XtreamCodesClient(
+            credentials["server"], credentials["username"], credentials["password"]
+        )
+        self._prefetch_future = _start_prefetch(self._client)
         super().accept()
+
+    def get_client(self) -> Optional[XtreamCodesClient]:
+        """Get the client used for prefetching, with its connections already open"""
+        return self._client
+
+    def get_prefetch(self) -> Optional[Future]:
+        """Get the future holding categories prefetched on accept"""
+        return self._prefetch_future
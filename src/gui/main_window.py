@@ -8,8 +8,7 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QSplitter,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
     QTabWidget,
     QMenuBar,
     QMenu,
@@ -26,63 +25,97 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QAction, QIcon
 
+from .content_tree_model import ContentTreeModel
 from .media_player import MediaPlayerWidget
 from .login_dialog import LoginDialog
-from api.xtream_client import XtreamCodesClient
-from parsers.m3u_parser import M3UParser
-from parsers.xmltv_parser import XMLTVParser
+from .streams_widget import StreamsWidget
+from api.xtream_client import CATALOG_ENDPOINTS, XtreamCodesClient
 
 
 class DataLoaderThread(QThread):
     data_loaded = pyqtSignal(dict)
+    cached_data_loaded = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     progress_updated = pyqtSignal(int, str)
 
-    def __init__(self, client):
-        super().__init__()
+    def __init__(self, client, prefetch=None, show_cached=False, parent=None):
+        super().__init__(parent)
         self.client = client
+        self.prefetch = prefetch
+        self.show_cached = show_cached
 
     def run(self):
         try:
+            if self.show_cached:
+                # Show the last known catalog while the stale parts are revalidated;
+                # a fully fresh cache loads just as fast through the normal path
+                cached, fresh = self.client.cached_catalog()
+                if cached and not fresh:
+                    self.cached_data_loaded.emit(cached)
+
+            # The probe comes first so the catalog fan-out can be sized to the
+            # account's max_connections; a login prefetch keeps running meanwhile
             self.progress_updated.emit(10, "Loading server info...")
             server_info = self.client.get_server_info()
+            if self.isInterruptionRequested():
+                return
             if not server_info:
                 self.error_occurred.emit("Failed to connect to server")
                 return
 
-            self.progress_updated.emit(30, "Loading categories...")
-            live_categories = self.client.get_live_categories()
-            vod_categories = self.client.get_vod_categories()
-            series_categories = self.client.get_series_categories()
-
-            self.progress_updated.emit(60, "Loading content...")
-            live_streams = self.client.get_live_streams()
-            vod_streams = self.client.get_vod_streams()
-            series = self.client.get_series()
+            data = {"server_info": server_info}
+            data.update(self.load_catalog())
+            if self.isInterruptionRequested():
+                return
 
             self.progress_updated.emit(100, "Complete!")
 
-            data = {
-                "server_info": server_info,
-                "live_categories": live_categories,
-                "vod_categories": vod_categories,
-                "series_categories": series_categories,
-                "live_streams": live_streams,
-                "vod_streams": vod_streams,
-                "series": series,
-            }
-
             self.data_loaded.emit(data)
 
         except Exception as e:
             self.error_occurred.emit(f"Error loading data: {str(e)}")
 
+    def load_catalog(self):
+        data = {}
+        if self.prefetch is not None:
+            try:
+                data.update(self.prefetch.result())
+            except Exception as e:
+                print(f"Catalog prefetch failed: {e}")
+
+        remaining = [key for key in CATALOG_ENDPOINTS if not data.get(key)]
+        total = len(CATALOG_ENDPOINTS)
+        done = total - len(remaining)
+        for key, result in self.client.iter_catalog(
+            remaining, should_stop=self.isInterruptionRequested
+        ):
+            data[key] = result
+            done += 1
+            self.progress_updated.emit(
+                20 + 70 * done // total, f"Loaded {key.replace('_', ' ')}..."
+            )
+        return data
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.client = None
         self.current_data = {}
+        self._live_by_cat = {}
+        self._vod_by_cat = {}
+        self._series_by_cat = {}
+        self.streams_widget = None
+        self.loader_thread = None
+        # Login prefetch for self.client, still in flight or done
+        self._prefetch = None
+        self._showing_cached = False
+        # Progress reports are coalesced so the bar repaints at most every 100 ms
+        self._progress_pending = None
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setSingleShot(True)
+        self._progress_timer.setInterval(100)
+        self._progress_timer.timeout.connect(self._flush_progress)
         self.init_ui()
         self.show_login_dialog()
 
@@ -161,113 +194,157 @@ class MainWindow(QMainWindow):
         view_menu.addAction(refresh_action)
 
     def create_content_tree(self):
-        self.content_tree = QTreeWidget()
-        self.content_tree.setHeaderLabel("Content")
-        self.content_tree.itemClicked.connect(self.on_tree_item_clicked)
-
-        # Add main sections
-        self.live_tv_item = QTreeWidgetItem(self.content_tree, ["Live TV"])
-        self.movies_item = QTreeWidgetItem(self.content_tree, ["Movies"])
-        self.series_item = QTreeWidgetItem(self.content_tree, ["Series"])
+        # Main sections are fixed; category rows are created when expanded
+        self.content_model = ContentTreeModel(self)
+        self.content_tree = QTreeView()
+        self.content_tree.setModel(self.content_model)
+        self.content_tree.setUniformRowHeights(True)
+        self.content_tree.clicked.connect(self.on_tree_item_clicked)
 
     def show_login_dialog(self):
         dialog = LoginDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             credentials = dialog.get_credentials()
-            self.connect_to_server(credentials)
+            self.connect_to_server(
+                credentials, dialog.get_prefetch(), dialog.get_client()
+            )
 
-    def connect_to_server(self, credentials):
+    def connect_to_server(self, credentials, prefetch=None, client=None):
         try:
-            self.client = XtreamCodesClient(
+            # Reusing the dialog's client keeps its pooled connections and memo
+            previous_client = self.client
+            previous_loader = self.loader_thread
+            previous_prefetch = self._prefetch
+            self.client = client or XtreamCodesClient(
                 credentials["server"], credentials["username"], credentials["password"]
             )
+            self._prefetch = prefetch
 
             # Start loading data in background thread
-            self.loader_thread = DataLoaderThread(self.client)
-            self.loader_thread.data_loaded.connect(self.on_data_loaded)
-            self.loader_thread.error_occurred.connect(self.on_loading_error)
-            self.loader_thread.progress_updated.connect(self.update_progress)
-            self.loader_thread.start()
+            self._showing_cached = False
+            self._start_loader("Connecting...", prefetch, show_cached=True)
 
-            self.progress_bar.setVisible(True)
-            self.status_label.setText("Connecting...")
+            if previous_client is not None and previous_client is not self.client:
+                self._close_client_when_idle(
+                    previous_client, previous_loader, previous_prefetch
+                )
 
         except Exception as e:
             QMessageBox.critical(
                 self, "Connection Error", f"Failed to connect: {str(e)}"
             )
 
+    @staticmethod
+    def _close_client_when_idle(client, loader, prefetch):
+        """Close a replaced client once its loader and login prefetch stop using it"""
+
+        def close_after_prefetch():
+            if prefetch is not None:
+                # Runs at once if the prefetch has already finished
+                prefetch.add_done_callback(lambda _: client.close())
+            else:
+                client.close()
+
+        if loader is not None and loader.isRunning():
+            loader.finished.connect(close_after_prefetch)
+            # close() is idempotent, so cover a loader that ended while connecting
+            if loader.isFinished():
+                close_after_prefetch()
+        else:
+            close_after_prefetch()
+
+    def _start_loader(self, status_text, prefetch=None, show_cached=False):
+        """Start loading data for self.client, abandoning any load in flight"""
+        previous = self.loader_thread
+        if previous is not None and previous.isRunning():
+            # Its results are no longer wanted; being parented to the window keeps
+            # it alive until run() returns, after which it deletes itself
+            previous.data_loaded.disconnect()
+            previous.cached_data_loaded.disconnect()
+            previous.error_occurred.disconnect()
+            previous.progress_updated.disconnect()
+            previous.requestInterruption()
+
+        self.loader_thread = DataLoaderThread(
+            self.client, prefetch, show_cached, parent=self
+        )
+        # Every loader deletes itself once run() returns, releasing its client
+        self.loader_thread.finished.connect(self._on_loader_finished)
+        self.loader_thread.finished.connect(self.loader_thread.deleteLater)
+        self.loader_thread.data_loaded.connect(self.on_data_loaded)
+        self.loader_thread.cached_data_loaded.connect(self.on_cached_data_loaded)
+        self.loader_thread.error_occurred.connect(self.on_loading_error)
+        self.loader_thread.progress_updated.connect(self.update_progress)
+        self.loader_thread.start()
+
+        self.progress_bar.setVisible(True)
+        self.status_label.setText(status_text)
+
+    def _on_loader_finished(self):
+        # Forget the loader before deleteLater runs, so it is never touched again
+        if self.sender() is self.loader_thread:
+            self.loader_thread = None
+
     def update_progress(self, value, message):
+        if value >= 100:
+            # Completion is applied at once so the bar always finishes
+            self._progress_timer.stop()
+            self._progress_pending = None
+            self.progress_bar.setValue(value)
+            self.status_label.setText(message)
+            return
+
+        self._progress_pending = (value, message)
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        if self._progress_pending is None:
+            return
+
+        value, message = self._progress_pending
+        self._progress_pending = None
         self.progress_bar.setValue(value)
         self.status_label.setText(message)
 
     def on_data_loaded(self, data):
-        self.current_data = data
-        self.populate_content_tree()
+        self._apply_catalog(data)
+        self._showing_cached = False
         self.progress_bar.setVisible(False)
         self.status_label.setText("Connected")
 
+    def on_cached_data_loaded(self, data):
+        self._apply_catalog(data)
+        self._showing_cached = True
+        self.status_label.setText("Showing cached content, refreshing...")
+
+    def _apply_catalog(self, data):
+        self.current_data = data
+        self._live_by_cat = self._group_by_category(data.get("live_streams", []))
+        self._vod_by_cat = self._group_by_category(data.get("vod_streams", []))
+        self._series_by_cat = self._group_by_category(data.get("series", []))
+        self.populate_content_tree()
+
     def on_loading_error(self, error_message):
+        # Drop any queued progress so it cannot overwrite the error status
+        self._progress_timer.stop()
+        self._progress_pending = None
         self.progress_bar.setVisible(False)
+        if self._showing_cached:
+            # The cached catalog stays usable, so report the failure quietly
+            self.status_label.setText(
+                f"Offline, showing cached content: {error_message}"
+            )
+            return
+
         self.status_label.setText("Connection failed")
         QMessageBox.critical(self, "Loading Error", error_message)
 
     def populate_content_tree(self):
-        # Clear existing items
-        self.live_tv_item.takeChildren()
-        self.movies_item.takeChildren()
-        self.series_item.takeChildren()
-
-        # Populate Live TV categories
-        for category in self.current_data.get("live_categories", []):
-            category_item = QTreeWidgetItem(
-                self.live_tv_item, [category.get("category_name", "Unknown")]
-            )
-            category_item.setData(
-                0,
-                Qt.ItemDataRole.UserRole,
-                {
-                    "type": "live_category",
-                    "category_id": category.get("category_id"),
-                    "data": category,
-                },
-            )
-
-        # Populate Movies categories
-        for category in self.current_data.get("vod_categories", []):
-            category_item = QTreeWidgetItem(
-                self.movies_item, [category.get("category_name", "Unknown")]
-            )
-            category_item.setData(
-                0,
-                Qt.ItemDataRole.UserRole,
-                {
-                    "type": "vod_category",
-                    "category_id": category.get("category_id"),
-                    "data": category,
-                },
-            )
+        self.content_model.set_catalog(self.current_data)
 
-        # Populate Series categories
-        for category in self.current_data.get("series_categories", []):
-            category_item = QTreeWidgetItem(
-                self.series_item, [category.get("category_name", "Unknown")]
-            )
-            category_item.setData(
-                0,
-                Qt.ItemDataRole.UserRole,
-                {
-                    "type": "series_category",
-                    "category_id": category.get("category_id"),
-                    "data": category,
-                },
-            )
-
-        # Expand all items
-        self.content_tree.expandAll()
-
-    def on_tree_item_clicked(self, item, column):
-        data = item.data(0, Qt.ItemDataRole.UserRole)
+    def on_tree_item_clicked(self, index):
+        data = index.data(Qt.ItemDataRole.UserRole)
         if not data:
             return
 
@@ -281,43 +358,41 @@ class MainWindow(QMainWindow):
         elif item_type == "series_category":
             self.load_series(category_id)
 
+    @staticmethod
+    def _group_by_category(streams):
+        """Index streams by category id so a category click is a dict lookup"""
+        by_category = {}
+        for stream in streams:
+            # Streams are Stream records, so read the slot instead of going via get()
+            by_category.setdefault(stream.category_id, []).append(stream)
+        return by_category
+
     def load_live_streams(self, category_id):
-        streams = [
-            s
-            for s in self.current_data.get("live_streams", [])
-            if s.get("category_id") == str(category_id)
-        ]
+        streams = self._live_by_cat.get(str(category_id), [])
         self.display_streams(streams, "live")
 
     def load_vod_streams(self, category_id):
-        streams = [
-            s
-            for s in self.current_data.get("vod_streams", [])
-            if s.get("category_id") == str(category_id)
-        ]
+        streams = self._vod_by_cat.get(str(category_id), [])
         self.display_streams(streams, "vod")
 
     def load_series(self, category_id):
-        series = [
-            s
-            for s in self.current_data.get("series", [])
-            if s.get("category_id") == str(category_id)
-        ]
+        series = self._series_by_cat.get(str(category_id), [])
         self.display_streams(series, "series")
 
     def display_streams(self, streams, stream_type):
-        # Clear existing tabs
-        self.content_tabs.clear()
+        title = f"{stream_type.title()} ({len(streams)})"
 
-        # Create streams list widget
-        from .streams_widget import StreamsWidget
-
-        streams_widget = StreamsWidget(streams, stream_type, self.client)
-        streams_widget.stream_selected.connect(self.play_stream)
+        # One streams widget is created on first use and refilled afterwards
+        if self.streams_widget is not None:
+            self.streams_widget.set_streams(streams, stream_type, self.client)
+            self.content_tabs.setTabText(
+                self.content_tabs.indexOf(self.streams_widget), title
+            )
+            return
 
-        self.content_tabs.addTab(
-            streams_widget, f"{stream_type.title()} ({len(streams)})"
-        )
+        self.streams_widget = StreamsWidget(streams, stream_type, self.client)
+        self.streams_widget.stream_selected.connect(self.play_stream)
+        self.content_tabs.addTab(self.streams_widget, title)
 
     def play_stream(self, stream_url, stream_info):
         self.media_player.play_stream(stream_url)
@@ -325,11 +400,5 @@ class MainWindow(QMainWindow):
 
     def refresh_data(self):
         if self.client:
-            self.loader_thread = DataLoaderThread(self.client)
-            self.loader_thread.data_loaded.connect(self.on_data_loaded)
-            self.loader_thread.error_occurred.connect(self.on_loading_error)
-            self.loader_thread.progress_updated.connect(self.update_progress)
-            self.loader_thread.start()
-
-            self.progress_bar.setVisible(True)
-            self.status_label.setText("Refreshing...")
+            self.client.expire_cache()
+            self._start_loader("Refreshing...")
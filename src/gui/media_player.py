@@ -2,6 +2,8 @@
 Media Player Widget using VLC
 """
 
+from functools import lru_cache
+
 import vlc
 from PyQt6.QtWidgets import (
     QWidget,
@@ -16,6 +18,19 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QPalette
 
+# Interval of the position/time refresh while media is playing
+UPDATE_INTERVAL_MS = 250
+
+
+@lru_cache(maxsize=128)
+def _format_seconds(total):
+    """Format whole seconds as MM:SS, or HH:MM:SS from an hour up"""
+    hours, rem = divmod(total, 3600)
+    minutes, seconds = divmod(rem, 60)
+    if hours:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
 
 class MediaPlayerWidget(QWidget):
     position_changed = pyqtSignal(int)
@@ -24,6 +39,9 @@ class MediaPlayerWidget(QWidget):
         super().__init__()
         self.media_player = None
         self.is_paused = False
+        # Last values pushed to the controls, so unchanged ticks skip repaints
+        self._last_pos = -1
+        self._last_time_text = ""
         self.init_ui()
         self.init_vlc()
 
@@ -78,10 +96,9 @@ class MediaPlayerWidget(QWidget):
 
         layout.addLayout(controls_layout)
 
-        # Timer for updating position
+        # Timer for updating position, only running while media is playing
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_ui)
-        self.timer.start(100)
 
     def init_vlc(self):
         # Create VLC instance
@@ -105,6 +122,7 @@ class MediaPlayerWidget(QWidget):
         self.media_player.play()
         self.play_button.setText("Pause")
         self.is_paused = False
+        self.timer.start(UPDATE_INTERVAL_MS)
 
     def toggle_play_pause(self):
         if self.media_player.get_media():
@@ -112,17 +130,22 @@ class MediaPlayerWidget(QWidget):
                 self.media_player.play()
                 self.play_button.setText("Pause")
                 self.is_paused = False
+                self.timer.start(UPDATE_INTERVAL_MS)
             else:
+                self.timer.stop()
                 self.media_player.pause()
                 self.play_button.setText("Play")
                 self.is_paused = True
 
     def stop(self):
+        self.timer.stop()
         self.media_player.stop()
         self.play_button.setText("Play")
         self.is_paused = False
         self.position_slider.setValue(0)
         self.time_label.setText("00:00 / 00:00")
+        self._last_pos = 0
+        self._last_time_text = "00:00 / 00:00"
 
     def set_position(self, position):
         if self.media_player.get_media():
@@ -133,12 +156,11 @@ class MediaPlayerWidget(QWidget):
             self.media_player.audio_set_volume(volume)
 
     def update_ui(self):
-        if not self.media_player.get_media():
-            return
-
         # Update position slider
         media_pos = int(self.media_player.get_position() * 1000)
-        self.position_slider.setValue(media_pos)
+        if media_pos != self._last_pos:
+            self._last_pos = media_pos
+            self.position_slider.setValue(media_pos)
 
         # Update time label
         current_time = self.media_player.get_time()
@@ -147,14 +169,11 @@ class MediaPlayerWidget(QWidget):
         if current_time >= 0 and total_time > 0:
             current_str = self.format_time(current_time)
             total_str = self.format_time(total_time)
-            self.time_label.setText(f"{current_str} / {total_str}")
-
-    def format_time(self, milliseconds):
-        seconds = milliseconds // 1000
-        minutes = seconds // 60
-        hours = minutes // 60
-
-        if hours > 0:
-            return f"{hours:02d}:{minutes%60:02d}:{seconds%60:02d}"
-        else:
-            return f"{minutes:02d}:{seconds%60:02d}"
+            time_text = f"{current_str} / {total_str}"
+            if time_text != self._last_time_text:
+                self._last_time_text = time_text
+                self.time_label.setText(time_text)
+
+    @staticmethod
+    def format_time(milliseconds):
+        return _format_seconds(milliseconds // 1000)
@@ -0,0 +1,57 @@
+"""
+Stream List Model for displaying streams in a QListView
+"""
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Rows exposed per fetchMore call; the view asks for more as it scrolls to the end
+PAGE_SIZE = 500
+
+
+class StreamListModel(QAbstractListModel):
+    def __init__(self, streams=None, default_name="Unknown", parent=None):
+        super().__init__(parent)
+        self._streams = list(streams or [])
+        self._rendered = min(PAGE_SIZE, len(self._streams))
+        self.default_name = default_name
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._rendered
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._rendered < len(self._streams)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+
+        count = min(PAGE_SIZE, len(self._streams) - self._rendered)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._rendered, self._rendered + count - 1)
+        self._rendered += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        stream = self._streams[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return stream.get("name", self.default_name)
+        if role == Qt.ItemDataRole.UserRole:
+            return stream
+        return None
+
+    def set_streams(self, streams):
+        """Replace all rows with a single model reset, exposing the first page"""
+        self.beginResetModel()
+        self._streams = list(streams)
+        self._rendered = min(PAGE_SIZE, len(self._streams))
+        self.endResetModel()
+
+    def stream_at(self, row):
+        return self._streams[row]
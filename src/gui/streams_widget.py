@@ -6,8 +6,7 @@ from PyQt6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QLabel,
     QPushButton,
     QLineEdit,
@@ -16,20 +15,70 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QGroupBox,
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt6.QtGui import QPixmap, QFont
 
+from .stream_list_model import StreamListModel
+from utils.search_index import NameIndex
+
+_MEDIA_FIELDS = (
+    ("Plot", "plot", None),
+    ("Genre", "genre", None),
+    ("Release Date", "release_date", None),
+    ("Rating", "rating", None),
+)
+
+# Row text for streams without a name, per stream type
+_DEFAULT_NAMES = {"live": "Unknown Channel", "vod": "Unknown Movie"}
+
+# Details panel lines per stream type, as (label, stream key, default) triples;
+# a line whose key is missing is shown with its default, or skipped if it has none
+_FIELDS = {
+    "live": (
+        ("Category", "category_id", "Unknown"),
+        ("EPG ID", "epg_channel_id", None),
+    ),
+    "vod": _MEDIA_FIELDS,
+    "series": _MEDIA_FIELDS,
+}
+
 
 class StreamsWidget(QWidget):
-    stream_selected = pyqtSignal(str, dict)
+    stream_selected = pyqtSignal(str, object)
 
     def __init__(self, streams, stream_type, client):
         super().__init__()
+        self.init_ui()
+        self.set_streams(streams, stream_type, client)
+
+    def set_streams(self, streams, stream_type, client):
+        """Show another list of streams, reusing the existing widgets and model"""
         self.streams = streams
         self.stream_type = stream_type
         self.client = client
         self.filtered_streams = streams.copy()
-        self.init_ui()
+        self._name_index = NameIndex([stream.get("name") for stream in streams])
+        self._filtered_indices = list(range(len(streams)))
+        self._last_query = ""
+
+        # Reset the search without scheduling a filter pass
+        self._filter_timer.stop()
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+
+        # Show the controls that apply to this stream type
+        has_categories = stream_type in ["live", "vod"]
+        self.category_label.setVisible(has_categories)
+        self.category_filter.setVisible(has_categories)
+        self.episodes_button.setVisible(stream_type == "series")
+
+        self.selected_stream = None
+        self.title_label.clear()
+        self.info_text.clear()
+        self.play_button.setEnabled(False)
+        self.episodes_button.setEnabled(False)
+
         self.populate_streams()
 
     def init_ui(self):
@@ -40,18 +89,23 @@ class StreamsWidget(QWidget):
 
         # Search box
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search streams...")
-        self.search_input.textChanged.connect(self.filter_streams)
+        self.search_input.setPlaceholderText("Search streams... (^ for starts with)")
+        # Filter once typing pauses rather than on every keystroke
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self.filter_streams)
+        self.search_input.textChanged.connect(self._filter_timer.start)
         controls_layout.addWidget(QLabel("Search:"))
         controls_layout.addWidget(self.search_input)
 
-        # Category filter (if applicable)
-        if self.stream_type in ["live", "vod"]:
-            self.category_filter = QComboBox()
-            self.category_filter.addItem("All Categories")
-            self.category_filter.currentTextChanged.connect(self.filter_streams)
-            controls_layout.addWidget(QLabel("Category:"))
-            controls_layout.addWidget(self.category_filter)
+        # Category filter (shown for live and vod streams)
+        self.category_label = QLabel("Category:")
+        self.category_filter = QComboBox()
+        self.category_filter.addItem("All Categories")
+        self.category_filter.currentTextChanged.connect(self.filter_streams)
+        controls_layout.addWidget(self.category_label)
+        controls_layout.addWidget(self.category_filter)
 
         controls_layout.addStretch()
 
@@ -65,10 +119,14 @@ class StreamsWidget(QWidget):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         layout.addWidget(splitter)
 
-        # Streams list
-        self.streams_list = QListWidget()
-        self.streams_list.itemClicked.connect(self.on_stream_selected)
-        self.streams_list.itemDoubleClicked.connect(self.on_stream_double_clicked)
+        # Streams list; the view only asks the model for rows it paints
+        self.streams_model = StreamListModel(parent=self)
+        self.streams_list = QListView()
+        self.streams_list.setModel(self.streams_model)
+        # Every row is one line of text, so skip measuring each row on layout
+        self.streams_list.setUniformItemSizes(True)
+        self.streams_list.clicked.connect(self.on_stream_selected)
+        self.streams_list.doubleClicked.connect(self.on_stream_double_clicked)
         splitter.addWidget(self.streams_list)
 
         # Details panel
@@ -99,11 +157,11 @@ class StreamsWidget(QWidget):
         self.play_button.setEnabled(False)
         buttons_layout.addWidget(self.play_button)
 
-        if self.stream_type == "series":
-            self.episodes_button = QPushButton("View Episodes")
-            self.episodes_button.clicked.connect(self.show_episodes)
-            self.episodes_button.setEnabled(False)
-            buttons_layout.addWidget(self.episodes_button)
+        # Episodes button (shown for series)
+        self.episodes_button = QPushButton("View Episodes")
+        self.episodes_button.clicked.connect(self.show_episodes)
+        self.episodes_button.setEnabled(False)
+        buttons_layout.addWidget(self.episodes_button)
 
         buttons_layout.addStretch()
         details_layout.addLayout(buttons_layout)
@@ -114,52 +172,45 @@ class StreamsWidget(QWidget):
         # Set splitter proportions
         splitter.setSizes([600, 400])
 
-        self.selected_stream = None
-
     def populate_streams(self):
-        self.streams_list.clear()
-
-        for stream in self.filtered_streams:
-            item = QListWidgetItem()
-
-            # Set display text based on stream type
-            if self.stream_type == "live":
-                title = stream.get("name", "Unknown Channel")
-            elif self.stream_type == "vod":
-                title = stream.get("name", "Unknown Movie")
-            else:  # series
-                title = stream.get("name", "Unknown Series")
-
-            item.setText(title)
-            item.setData(Qt.ItemDataRole.UserRole, stream)
-            self.streams_list.addItem(item)
-
+        self.streams_model.default_name = _DEFAULT_NAMES.get(
+            self.stream_type, "Unknown Series"
+        )
+        self.streams_model.set_streams(self.filtered_streams)
         self.update_count_label()
 
     def filter_streams(self):
-        search_text = self.search_input.text().lower()
-
-        self.filtered_streams = []
-        for stream in self.streams:
-            name = stream.get("name", "").lower()
-            if search_text in name:
-                self.filtered_streams.append(stream)
+        self._filter_timer.stop()
+        query = self.search_input.text().lower()
+
+        if query.startswith("^"):
+            # Anchored queries are answered from the sorted prefix index
+            self._filtered_indices = self._name_index.search_prefix(query[1:])
+        else:
+            within = None
+            if self._last_query and query.startswith(self._last_query):
+                # A longer query can only narrow the previous matches
+                within = self._filtered_indices
+
+            self._filtered_indices = self._name_index.search(query, within)
+        self._last_query = query
+        self.filtered_streams = [self.streams[i] for i in self._filtered_indices]
 
         self.populate_streams()
 
     def update_count_label(self):
         self.count_label.setText(f"{len(self.filtered_streams)} streams")
 
-    def on_stream_selected(self, item):
-        self.selected_stream = item.data(Qt.ItemDataRole.UserRole)
+    def on_stream_selected(self, index):
+        self.selected_stream = self.streams_model.stream_at(index.row())
         self.update_details_panel()
         self.play_button.setEnabled(True)
 
         if self.stream_type == "series":
             self.episodes_button.setEnabled(True)
 
-    def on_stream_double_clicked(self, item):
-        self.on_stream_selected(item)
+    def on_stream_double_clicked(self, index):
+        self.on_stream_selected(index)
         self.play_selected_stream()
 
     def update_details_panel(self):
@@ -171,40 +222,13 @@ class StreamsWidget(QWidget):
         self.title_label.setText(title)
 
         # Update info text
-        info_lines = []
-
-        if self.stream_type == "live":
-            info_lines.append(
-                f"Category: {self.selected_stream.get('category_id', 'Unknown')}"
-            )
-            if "epg_channel_id" in self.selected_stream:
-                info_lines.append(f"EPG ID: {self.selected_stream['epg_channel_id']}")
-
-        elif self.stream_type == "vod":
-            if "plot" in self.selected_stream:
-                info_lines.append(f"Plot: {self.selected_stream['plot']}")
-            if "genre" in self.selected_stream:
-                info_lines.append(f"Genre: {self.selected_stream['genre']}")
-            if "release_date" in self.selected_stream:
-                info_lines.append(
-                    f"Release Date: {self.selected_stream['release_date']}"
-                )
-            if "rating" in self.selected_stream:
-                info_lines.append(f"Rating: {self.selected_stream['rating']}")
-
-        elif self.stream_type == "series":
-            if "plot" in self.selected_stream:
-                info_lines.append(f"Plot: {self.selected_stream['plot']}")
-            if "genre" in self.selected_stream:
-                info_lines.append(f"Genre: {self.selected_stream['genre']}")
-            if "release_date" in self.selected_stream:
-                info_lines.append(
-                    f"Release Date: {self.selected_stream['release_date']}"
-                )
-            if "rating" in self.selected_stream:
-                info_lines.append(f"Rating: {self.selected_stream['rating']}")
-
-        self.info_text.setText("\n".join(info_lines))
+        stream = self.selected_stream
+        info_lines = [
+            f"{label}: {stream.get(key, default)}"
+            for label, key, default in _FIELDS.get(self.stream_type, ())
+            if key in stream or default is not None
+        ]
+        self.info_text.setPlainText("\n".join(info_lines))
 
     def play_selected_stream(self):
         if not self.selected_stream:
@@ -220,7 +244,9 @@ class StreamsWidget(QWidget):
         if self.stream_type == "live":
             stream_url = self.client.get_stream_url(stream_id, "live")
         elif self.stream_type == "vod":
-            stream_url = self.client.get_stream_url(stream_id, "movie")
+            stream_url = self.client.get_stream_url(
+                stream_id, "movie", self.selected_stream.get("container_extension")
+            )
         else:  # series
             # For series, we'll need to handle episodes differently
             # For now, just emit the series info
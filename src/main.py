@@ -5,9 +5,7 @@ Main entry point for the IPTV player application with Xtream Codes support.
 """
 
 import sys
-import os
-from PyQt6.QtWidgets import QApplication, QMainWindow
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
 
 from gui.main_window import MainWindow
 
@@ -3,10 +3,124 @@ M3U Playlist Parser
 Parses M3U playlist files and categorizes streams
 """
 
+import hashlib
+import io
+import os
+import pickle
 import re
-import requests
-from typing import List, Dict, Optional
-from urllib.parse import urlparse, unquote
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from utils.search_index import NameIndex
+
+# Patterns used on every playlist entry, compiled once. _RE_EXTINF reads the
+# duration, attribute section and the title after the last comma in one pass
+_RE_HEADER = re.compile(r"\s*#EXTM3U")
+_RE_EXTINF = re.compile(
+    r"^#EXTINF:(?P<dur>[^,\s]+)?(?P<attrs>.*?)(?:,(?P<title>[^,]*))?$"
+)
+_RE_SE = re.compile(r"s\d+e\d+|season\s+\d+|episode\s+\d+")
+
+# File extensions that mark a URL as a movie, or as a live stream
+MOVIE_EXTENSIONS = (".mp4", ".mkv", ".avi")
+LIVE_EXTENSIONS = (".m3u8", ".ts", ".m3u")
+
+MOVIE_INDICATORS = (
+    "movie",
+    "film",
+    "cinema",
+    "vod",
+    "on demand",
+    "hollywood",
+    "bollywood",
+    "action",
+    "comedy",
+    "drama",
+    "horror",
+    "thriller",
+    "sci-fi",
+    "animation",
+    "documentary",
+    "adventure",
+)
+
+SERIES_INDICATORS = (
+    "series",
+    "tv",
+    "show",
+    "season",
+    "episode",
+    "drama series",
+    "comedy series",
+    "reality",
+    "documentary series",
+)
+
+# Each indicator set as one alternation, so a group title is scanned once in C
+# rather than once per indicator
+_RE_MOVIE_INDICATORS = re.compile("|".join(map(re.escape, MOVIE_INDICATORS)))
+_RE_SERIES_INDICATORS = re.compile("|".join(map(re.escape, SERIES_INDICATORS)))
+
+# Attribute names are stored with underscores, e.g. tvg-id -> tvg_id
+_KEY_TABLE = str.maketrans("-", "_")
+
+
+def _scan_attrs(line: str, start: int = 0) -> Dict:
+    """Read key="value" attributes from line with str.find instead of a regex"""
+    attrs = {}
+    find = line.find
+    position = start
+
+    while True:
+        equals = find('="', position)
+        if equals == -1:
+            break
+        value_start = equals + 2
+        value_end = find('"', value_start)
+        if value_end == -1:
+            break
+
+        # The key runs back from the '=' to the preceding whitespace
+        key_start = equals
+        while key_start > position and not line[key_start - 1].isspace():
+            key_start -= 1
+        if key_start < equals:
+            key = line[key_start:equals].translate(_KEY_TABLE)
+            attrs[key] = line[value_start:value_end]
+        position = value_end + 1
+
+    return attrs
+
+
+# Playlists smaller than this parse faster in-process than in a process pool
+PARALLEL_MIN_SIZE = 4 * 1024 * 1024
+
+
+def _parse_chunk(chunk: str):
+    """Parse a slice of playlist entries in a worker process"""
+    parser = M3UParser()
+    parser._parse_entries(io.StringIO(chunk))
+    return parser.channels, parser.movies, parser.series
+
+
+def _cache_path(m3u_url: str) -> Path:
+    """Get the cache file for a playlist URL under the settings directory"""
+    from utils.settings import settings
+
+    name = hashlib.sha1(m3u_url.encode("utf-8")).hexdigest()
+    return settings.settings_dir / "m3u_cache" / f"{name}.pickle"
+
+
+def _cache_validator(headers) -> Optional[str]:
+    """Get what identifies a playlist version: its ETag, else its Content-Length"""
+    etag = headers.get("ETag")
+    if etag:
+        return etag
+    length = headers.get("Content-Length")
+    return f"length:{length}" if length else None
 
 
 class M3UParser:
@@ -14,42 +128,147 @@ class M3UParser:
         self.channels = []
         self.movies = []
         self.series = []
+        # Title search indexes per content type, built on first search
+        self._title_indexes = {}
+        # Sorted category names per content type, built on first request
+        self._categories = {}
+
+    def parse_from_url(self, m3u_url: str, use_cache: bool = True) -> bool:
+        """Parse M3U playlist from URL, reusing the cache while it is up to date"""
+        import requests
+
+        cache_path = _cache_path(m3u_url) if use_cache else None
+        validator = None
+        # Only a playlist cached earlier is worth the extra HEAD round trip
+        if cache_path and cache_path.exists():
+            try:
+                head = requests.head(m3u_url, timeout=10, allow_redirects=True)
+                validator = _cache_validator(head.headers) if head.ok else None
+            except requests.exceptions.RequestException:
+                pass
+            if validator and self.load_cache(cache_path, validator):
+                return True
 
-    def parse_from_url(self, m3u_url: str) -> bool:
-        """Parse M3U playlist from URL"""
         try:
-            response = requests.get(m3u_url, timeout=30)
-            response.raise_for_status()
-            return self.parse_content(response.text)
+            # Parse lines as they arrive instead of holding the whole body as text
+            with requests.get(m3u_url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                response.encoding = response.encoding or "utf-8"
+                parsed = self.parse_lines(response.iter_lines(decode_unicode=True))
+                validator = _cache_validator(response.headers) or validator
         except requests.exceptions.RequestException as e:
             print(f"Failed to fetch M3U: {e}")
             return False
 
+        if parsed and cache_path and validator:
+            self.save_cache(cache_path, validator)
+        return parsed
+
     def parse_from_file(self, file_path: str) -> bool:
         """Parse M3U playlist from file"""
         try:
             with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return self.parse_content(content)
+                return self.parse_lines(f)
         except IOError as e:
             print(f"Failed to read M3U file: {e}")
             return False
 
     def parse_content(self, content: str) -> bool:
         """Parse M3U playlist content"""
+        return self.parse_lines(io.StringIO(content))
+
+    def parse_content_parallel(
+        self, content: str, workers: Optional[int] = None
+    ) -> bool:
+        """Parse large M3U playlist content across worker processes"""
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(content) < PARALLEL_MIN_SIZE:
+            return self.parse_content(content)
+
+        if not _RE_HEADER.match(content):
+            print("Invalid M3U format")
+            return False
+
+        # Split at entry starts so every EXTINF stays with its URL line
+        size = len(content)
+        bounds = [0]
+        for n in range(1, workers):
+            position = content.find("\n#EXTINF:", size * n // workers)
+            if position == -1:
+                break
+            if position + 1 > bounds[-1]:
+                bounds.append(position + 1)
+        bounds.append(size)
+        chunks = [content[start:end] for start, end in zip(bounds, bounds[1:])]
+
         self.channels.clear()
         self.movies.clear()
         self.series.clear()
+        self._title_indexes.clear()
+        self._categories.clear()
+
+        try:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                for channels, movies, series in executor.map(_parse_chunk, chunks):
+                    self.channels.extend(channels)
+                    self.movies.extend(movies)
+                    self.series.extend(series)
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Parallel M3U parse failed, parsing serially: {e}")
+            return self.parse_content(content)
 
-        lines = content.strip().split("\n")
+        return True
 
-        if not lines or not lines[0].startswith("#EXTM3U"):
-            print("Invalid M3U format")
+    def load_cache(
+        self, path: Union[str, Path], validator: Optional[str] = None
+    ) -> bool:
+        """Load parsed lists saved by save_cache, if present and validator matches"""
+        try:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Failed to load M3U cache: {e}")
             return False
 
+        if validator is not None and cached.get("validator") != validator:
+            return False
+
+        self.channels = cached["channels"]
+        self.movies = cached["movies"]
+        self.series = cached["series"]
+        self._title_indexes.clear()
+        self._categories.clear()
+        return True
+
+    def save_cache(self, path: Union[str, Path], validator: Optional[str] = None):
+        """Save the parsed lists so a later run can skip parsing"""
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+        data = {
+            "validator": validator,
+            "channels": self.channels,
+            "movies": self.movies,
+            "series": self.series,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                pickle.dump(data, f, protocol=5)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Failed to save M3U cache: {e}")
+
+    def _parse_entries(self, lines: Iterable[str]):
+        """Parse EXTINF/URL line pairs, appending each entry to its category list"""
+        items_by_category = {
+            "live": self.channels,
+            "movie": self.movies,
+            "series": self.series,
+        }
         current_item = {}
 
-        for line in lines[1:]:
+        for line in lines:
             line = line.strip()
 
             if line.startswith("#EXTINF:"):
@@ -57,9 +276,31 @@ class M3UParser:
             elif line and not line.startswith("#"):
                 if current_item:
                     current_item["url"] = line
-                    self._categorize_item(current_item)
+                    category = self._category_of(
+                        current_item.get("group_title", "").lower(),
+                        current_item["_title_lc"],
+                        line,
+                    )
+                    current_item["category"] = category
+                    items_by_category[category].append(current_item)
                     current_item = {}
 
+    def parse_lines(self, lines: Iterable[str]) -> bool:
+        """Parse M3U playlist lines one at a time"""
+        self.channels.clear()
+        self.movies.clear()
+        self.series.clear()
+        self._title_indexes.clear()
+        self._categories.clear()
+
+        lines = iter(lines)
+        header = next((line for line in lines if line.strip()), "")
+
+        if not header.lstrip().startswith("#EXTM3U"):
+            print("Invalid M3U format")
+            return False
+
+        self._parse_entries(lines)
         return True
 
     def _parse_extinf_line(self, line: str) -> Dict:
@@ -67,103 +308,53 @@ class M3UParser:
         # Example: #EXTINF:-1 tvg-id="channel.id" tvg-name="Channel Name" tvg-logo="logo.png" group-title="Category",Display Name
 
         item = {}
+        duration, attrs, title = _RE_EXTINF.match(line).group("dur", "attrs", "title")
 
         # Extract duration (usually -1 for streams)
-        duration_match = re.search(r"#EXTINF:([^,\s]+)", line)
-        if duration_match:
-            item["duration"] = duration_match.group(1)
+        if duration:
+            item["duration"] = duration
 
-        # Extract attributes
-        attributes = re.findall(r'(\w+(?:-\w+)*)="([^"]*)"', line)
-        for attr, value in attributes:
-            item[attr.replace("-", "_")] = value
+        # Extract attributes, scanning only the section before the title
+        item.update(_scan_attrs(attrs))
+        # Few group titles repeat across many entries, so share one string each
+        group_title = item.get("group_title")
+        if group_title is not None:
+            item["group_title"] = sys.intern(group_title)
 
         # Extract title (after the last comma)
-        title_match = re.search(r",([^,]+)$", line)
-        if title_match:
-            item["title"] = title_match.group(1).strip()
-        else:
-            item["title"] = "Unknown"
+        item["title"] = title.strip() if title else "Unknown"
+        # Lowercased once here for categorization and every later search
+        item["_title_lc"] = item["title"].lower()
 
         return item
 
-    def _categorize_item(self, item: Dict):
-        """Categorize item into channels, movies, or series"""
-        group_title = item.get("group_title", "").lower()
-        title = item.get("title", "").lower()
-        url = item.get("url", "")
-
-        # Determine category based on various indicators
-        if self._is_movie(group_title, title, url):
-            item["category"] = "movie"
-            self.movies.append(item)
-        elif self._is_series(group_title, title, url):
-            item["category"] = "series"
-            self.series.append(item)
-        else:
-            item["category"] = "live"
-            self.channels.append(item)
-
-    def _is_movie(self, group_title: str, title: str, url: str) -> bool:
-        """Determine if item is a movie"""
-        movie_indicators = [
-            "movie",
-            "film",
-            "cinema",
-            "vod",
-            "on demand",
-            "hollywood",
-            "bollywood",
-            "action",
-            "comedy",
-            "drama",
-            "horror",
-            "thriller",
-            "sci-fi",
-            "animation",
-            "documentary",
-            "adventure",
-        ]
-
-        # Check group title
-        for indicator in movie_indicators:
-            if indicator in group_title:
-                return True
-
-        # Check if URL suggests it's a movie (common patterns)
-        if "/movie/" in url or ".mp4" in url or ".mkv" in url:
-            return True
-
-        return False
-
-    def _is_series(self, group_title: str, title: str, url: str) -> bool:
-        """Determine if item is a series/TV show"""
-        series_indicators = [
-            "series",
-            "tv",
-            "show",
-            "season",
-            "episode",
-            "drama series",
-            "comedy series",
-            "reality",
-            "documentary series",
-        ]
-
-        # Check group title
-        for indicator in series_indicators:
-            if indicator in group_title:
-                return True
-
-        # Check title for season/episode patterns
-        if re.search(r"s\d+e\d+|season\s+\d+|episode\s+\d+", title):
-            return True
-
-        # Check if URL suggests it's a series
-        if "/series/" in url:
-            return True
-
-        return False
+    @staticmethod
+    def _category_of(group_title: str, title: str, url: str) -> str:
+        """Get "movie", "series" or "live" from lowercased group title and title"""
+        # Extensions are read from the path, ignoring any ?token=... or #fragment
+        path = url.split("?", 1)[0].split("#", 1)[0]
+
+        # Most entries are live streams, which skip the indicator scans entirely
+        if path.endswith(LIVE_EXTENSIONS):
+            if "/movie/" in url:
+                return "movie"
+            if "/series/" in url:
+                return "series"
+            return "live"
+
+        # Movies: URL patterns, then group title indicators
+        if "/movie/" in url or path.endswith(MOVIE_EXTENSIONS):
+            return "movie"
+        if _RE_MOVIE_INDICATORS.search(group_title):
+            return "movie"
+
+        # Series: URL pattern, group title indicators, then season/episode titles
+        if "/series/" in url or _RE_SERIES_INDICATORS.search(group_title):
+            return "series"
+        if _RE_SE.search(title):
+            return "series"
+
+        return "live"
 
     def get_categories(self, content_type: str) -> List[str]:
         """Get unique categories for given content type"""
@@ -176,13 +367,16 @@ class M3UParser:
         else:
             return []
 
-        categories = set()
-        for item in items:
-            group_title = item.get("group_title", "Uncategorized")
-            if group_title:
-                categories.add(group_title)
+        categories = self._categories.get(content_type)
+        if categories is None:
+            found = set()
+            for item in items:
+                group_title = item.get("group_title", "Uncategorized")
+                if group_title:
+                    found.add(group_title)
+            categories = self._categories[content_type] = tuple(sorted(found))
 
-        return sorted(list(categories))
+        return list(categories)
 
     def get_items_by_category(
         self, content_type: str, category: str = None
@@ -204,22 +398,23 @@ class M3UParser:
 
     def search_items(self, query: str, content_type: str = None) -> List[Dict]:
         """Search items by title"""
-        query = query.lower()
         results = []
 
         search_lists = []
         if content_type == "live" or not content_type:
-            search_lists.append(self.channels)
+            search_lists.append(("live", self.channels))
         if content_type == "movie" or not content_type:
-            search_lists.append(self.movies)
+            search_lists.append(("movie", self.movies))
         if content_type == "series" or not content_type:
-            search_lists.append(self.series)
-
-        for item_list in search_lists:
-            for item in item_list:
-                title = item.get("title", "").lower()
-                if query in title:
-                    results.append(item)
+            search_lists.append(("series", self.series))
+
+        for list_type, item_list in search_lists:
+            index = self._title_indexes.get(list_type)
+            if index is None:
+                index = self._title_indexes[list_type] = NameIndex(
+                    [item["_title_lc"] for item in item_list]
+                )
+            results.extend(item_list[i] for i in index.search(query))
 
         return results
 
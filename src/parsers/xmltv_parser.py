@@ -3,11 +3,56 @@ XMLTV EPG Parser
 Parses XMLTV Electronic Program Guide data and extracts categories
 """
 
-import xml.etree.ElementTree as ET
-import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timezone
-from dateutil import parser as date_parser
+import io
+import itertools
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+from lxml import etree
+
+from utils.search_index import NameIndex
+
+# Guides use a handful of UTC offsets, so share one tzinfo per offset
+_TIMEZONES = {}
+
+# Credit roles in the order they are reported
+_CREDIT_ROLES = (
+    "director",
+    "actor",
+    "writer",
+    "adapter",
+    "producer",
+    "composer",
+    "editor",
+    "presenter",
+    "commentator",
+    "guest",
+)
+
+# Programme fields search_programmes can look in
+_SEARCH_FIELDS = ("titles", "descriptions", "categories")
+
+
+def _texts_and_langs(elems) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Get the stripped texts of elements and their interned lang attributes"""
+    texts = []
+    langs = []
+    for elem in elems:
+        if elem.text:
+            texts.append(elem.text.strip())
+            # Only a handful of language codes exist, so share their strings
+            langs.append(sys.intern(elem.get("lang", "en")))
+    return tuple(texts), tuple(langs)
+
+
+def _timezone(offset_minutes: int) -> timezone:
+    tz = _TIMEZONES.get(offset_minutes)
+    if tz is None:
+        tz = _TIMEZONES[offset_minutes] = timezone(timedelta(minutes=offset_minutes))
+    return tz
 
 
 class XMLTVParser:
@@ -15,13 +60,26 @@ class XMLTVParser:
         self.channels = {}
         self.programmes = []
         self.categories = set()
+        # Programmes with a start time per channel, sorted by start, with parallel
+        # arrays of their start/stop POSIX timestamps (inf for no stop) and of the
+        # latest stop among each programme and all earlier ones
+        self._by_channel = {}
+        self._channel_starts = {}
+        self._channel_stops = {}
+        self._channel_max_stops = {}
+        # Programme rows per category, and search indexes built on first search
+        self._by_category = {}
+        self._search_indexes = {}
 
     def parse_from_url(self, xmltv_url: str) -> bool:
         """Parse XMLTV data from URL"""
+        import requests
+
         try:
             response = requests.get(xmltv_url, timeout=60)
             response.raise_for_status()
-            return self.parse_content(response.text)
+            # Raw bytes let the parser honour the document's declared encoding
+            return self.parse_content(response.content)
         except requests.exceptions.RequestException as e:
             print(f"Failed to fetch XMLTV: {e}")
             return False
@@ -29,72 +87,127 @@ class XMLTVParser:
     def parse_from_file(self, file_path: str) -> bool:
         """Parse XMLTV data from file"""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            return self.parse_content(content)
+            with open(file_path, "rb") as f:
+                return self._parse_source(f)
         except IOError as e:
             print(f"Failed to read XMLTV file: {e}")
             return False
 
-    def parse_content(self, content: str) -> bool:
+    def parse_content(self, content: Union[str, bytes]) -> bool:
         """Parse XMLTV content"""
+        if isinstance(content, str):
+            return self._parse_source(io.BytesIO(content.encode("utf-8")), "utf-8")
+        return self._parse_source(io.BytesIO(content))
+
+    def _clear(self):
+        """Drop all parsed data and the indexes built from it"""
+        self.channels.clear()
+        self.programmes.clear()
+        self.categories.clear()
+        self._by_channel.clear()
+        self._channel_starts.clear()
+        self._channel_stops.clear()
+        self._channel_max_stops.clear()
+        self._by_category.clear()
+        self._search_indexes.clear()
+
+    def _parse_source(self, source, encoding: Optional[str] = None) -> bool:
+        """Parse XMLTV from a file-like object, one channel/programme at a time"""
         try:
-            self.channels.clear()
-            self.programmes.clear()
-            self.categories.clear()
-
-            root = ET.fromstring(content)
-
-            # Parse channels
-            for channel_elem in root.findall("channel"):
-                channel_id = channel_elem.get("id")
-                if not channel_id:
-                    continue
-
-                channel_data = {
-                    "id": channel_id,
-                    "display_names": [],
-                    "icons": [],
-                    "urls": [],
-                }
-
-                # Get display names
-                for display_name in channel_elem.findall("display-name"):
-                    if display_name.text:
-                        channel_data["display_names"].append(display_name.text.strip())
-
-                # Get icons
-                for icon in channel_elem.findall("icon"):
-                    src = icon.get("src")
-                    if src:
-                        channel_data["icons"].append(src)
-
-                # Get URLs
-                for url in channel_elem.findall("url"):
-                    if url.text:
-                        channel_data["urls"].append(url.text.strip())
-
-                self.channels[channel_id] = channel_data
-
-            # Parse programmes
-            for programme_elem in root.findall("programme"):
-                programme_data = self._parse_programme(programme_elem)
-                if programme_data:
-                    self.programmes.append(programme_data)
-
-                    # Extract categories from programme
-                    for category in programme_data.get("categories", []):
-                        self.categories.add(category)
+            self._clear()
+
+            # Guides come from remote servers, so never resolve entities or fetch
+            # anything the document points to
+            context = etree.iterparse(
+                source,
+                events=("end",),
+                tag=("channel", "programme"),
+                encoding=encoding,
+                resolve_entities=False,
+                no_network=True,
+                huge_tree=False,
+            )
+            for _, elem in context:
+                if elem.tag == "channel":
+                    self._parse_channel(elem)
+                else:
+                    programme_data = self._parse_programme(elem)
+                    if programme_data:
+                        self.programmes.append(programme_data)
+
+                        # Extract categories from programme
+                        row = len(self.programmes) - 1
+                        for category in dict.fromkeys(programme_data["categories"]):
+                            self.categories.add(category)
+                            self._by_category.setdefault(category, []).append(row)
+
+                        if programme_data["start"]:
+                            self._by_channel.setdefault(
+                                programme_data["channel"], []
+                            ).append(programme_data)
+
+                # Drop parsed elements so memory stays flat over the whole guide
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+            for channel_id, programmes in self._by_channel.items():
+                programmes.sort(key=lambda programme: programme["start"].timestamp())
+                self._channel_starts[channel_id] = array(
+                    "d", [programme["start"].timestamp() for programme in programmes]
+                )
+                stops = self._channel_stops[channel_id] = array(
+                    "d",
+                    [
+                        programme["stop"].timestamp() if programme["stop"] else math.inf
+                        for programme in programmes
+                    ],
+                )
+                self._channel_max_stops[channel_id] = array(
+                    "d", itertools.accumulate(stops, max)
+                )
 
             return True
 
-        except ET.ParseError as e:
+        except etree.XMLSyntaxError as e:
+            # A partly parsed guide has incomplete indexes, so keep nothing of it
+            self._clear()
             print(f"Failed to parse XMLTV: {e}")
             return False
         except Exception as e:
+            self._clear()
             print(f"Error parsing XMLTV: {e}")
             return False
 
+    def _parse_channel(self, channel_elem):
+        """Parse a channel element into self.channels"""
+        channel_id = channel_elem.get("id")
+        if not channel_id:
+            return
+
+        channel_data = {
+            "id": channel_id,
+            "display_names": [],
+            "icons": [],
+            "urls": [],
+        }
+
+        # Get display names, icons and URLs in one pass over the children
+        for child in channel_elem:
+            tag = child.tag
+            if tag == "display-name":
+                if child.text:
+                    channel_data["display_names"].append(child.text.strip())
+            elif tag == "icon":
+                src = child.get("src")
+                if src:
+                    channel_data["icons"].append(src)
+            elif tag == "url":
+                if child.text:
+                    channel_data["urls"].append(child.text.strip())
+
+        self.channels[channel_id] = channel_data
+
     def _parse_programme(self, programme_elem) -> Optional[Dict]:
         """Parse a programme element"""
         channel = programme_elem.get("channel")
@@ -104,103 +217,95 @@ class XMLTVParser:
         if not all([channel, start]):
             return None
 
+        # One pass over the children, grouping them by tag
+        title_elems = []
+        sub_title_elems = []
+        desc_elems = []
+        categories = []
+        countries = []
+        languages = []
+        icons = []
+        ratings = []
+        credits = {}
+        credits_elem = None
+
+        for child in programme_elem:
+            tag = child.tag
+            if tag == "title":
+                title_elems.append(child)
+            elif tag == "sub-title":
+                sub_title_elems.append(child)
+            elif tag == "desc":
+                desc_elems.append(child)
+            elif tag == "category":
+                # Interned, as a guide repeats the same few categories everywhere
+                if child.text:
+                    categories.append(sys.intern(child.text.strip()))
+            elif tag == "country":
+                if child.text:
+                    countries.append(child.text.strip())
+            elif tag == "language":
+                if child.text:
+                    languages.append(sys.intern(child.text.strip()))
+            elif tag == "icon":
+                src = child.get("src")
+                if src:
+                    icons.append(src)
+            elif tag == "rating":
+                rating_data = {
+                    "system": child.get("system"),
+                    "value": None,
+                    "icons": [],
+                }
+                value_seen = False
+                for rating_child in child:
+                    if rating_child.tag == "value":
+                        # Only the first value counts, as with find("value")
+                        if not value_seen and rating_child.text:
+                            rating_data["value"] = rating_child.text.strip()
+                        value_seen = True
+                    elif rating_child.tag == "icon":
+                        src = rating_child.get("src")
+                        if src:
+                            rating_data["icons"].append(src)
+                ratings.append(rating_data)
+            elif tag == "credits" and credits_elem is None:
+                credits_elem = child
+
+        # Credits keep the XMLTV role order regardless of document order
+        if credits_elem is not None:
+            people_by_role = {}
+            for person in credits_elem:
+                if person.text and person.tag in _CREDIT_ROLES:
+                    people = people_by_role.setdefault(person.tag, [])
+                    people.append(person.text.strip())
+            for role in _CREDIT_ROLES:
+                if role in people_by_role:
+                    credits[role] = people_by_role[role]
+
+        # Texts and their languages are kept as parallel tuples
+        titles, title_langs = _texts_and_langs(title_elems)
+        sub_titles, sub_title_langs = _texts_and_langs(sub_title_elems)
+        descriptions, description_langs = _texts_and_langs(desc_elems)
+
         programme_data = {
             "channel": channel,
             "start": self._parse_datetime(start),
             "stop": self._parse_datetime(stop) if stop else None,
-            "titles": [],
-            "sub_titles": [],
-            "descriptions": [],
-            "categories": [],
-            "countries": [],
-            "languages": [],
-            "icons": [],
-            "ratings": [],
-            "credits": {},
+            "titles": titles,
+            "title_langs": title_langs,
+            "sub_titles": sub_titles,
+            "sub_title_langs": sub_title_langs,
+            "descriptions": descriptions,
+            "description_langs": description_langs,
+            "categories": categories,
+            "countries": countries,
+            "languages": languages,
+            "icons": icons,
+            "ratings": ratings,
+            "credits": credits,
         }
 
-        # Parse titles
-        for title in programme_elem.findall("title"):
-            if title.text:
-                programme_data["titles"].append(
-                    {"text": title.text.strip(), "lang": title.get("lang", "en")}
-                )
-
-        # Parse sub-titles
-        for sub_title in programme_elem.findall("sub-title"):
-            if sub_title.text:
-                programme_data["sub_titles"].append(
-                    {
-                        "text": sub_title.text.strip(),
-                        "lang": sub_title.get("lang", "en"),
-                    }
-                )
-
-        # Parse descriptions
-        for desc in programme_elem.findall("desc"):
-            if desc.text:
-                programme_data["descriptions"].append(
-                    {"text": desc.text.strip(), "lang": desc.get("lang", "en")}
-                )
-
-        # Parse categories
-        for category in programme_elem.findall("category"):
-            if category.text:
-                programme_data["categories"].append(category.text.strip())
-
-        # Parse countries
-        for country in programme_elem.findall("country"):
-            if country.text:
-                programme_data["countries"].append(country.text.strip())
-
-        # Parse languages
-        for language in programme_elem.findall("language"):
-            if language.text:
-                programme_data["languages"].append(language.text.strip())
-
-        # Parse icons
-        for icon in programme_elem.findall("icon"):
-            src = icon.get("src")
-            if src:
-                programme_data["icons"].append(src)
-
-        # Parse ratings
-        for rating in programme_elem.findall("rating"):
-            rating_data = {"system": rating.get("system"), "value": None, "icons": []}
-
-            value_elem = rating.find("value")
-            if value_elem is not None and value_elem.text:
-                rating_data["value"] = value_elem.text.strip()
-
-            for icon in rating.findall("icon"):
-                src = icon.get("src")
-                if src:
-                    rating_data["icons"].append(src)
-
-            programme_data["ratings"].append(rating_data)
-
-        # Parse credits
-        credits_elem = programme_elem.find("credits")
-        if credits_elem is not None:
-            for role in [
-                "director",
-                "actor",
-                "writer",
-                "adapter",
-                "producer",
-                "composer",
-                "editor",
-                "presenter",
-                "commentator",
-                "guest",
-            ]:
-                people = []
-                for person in credits_elem.findall(role):
-                    if person.text:
-                        people.append(person.text.strip())
-                if people:
-                    programme_data["credits"][role] = people
-
         return programme_data
 
     def _parse_datetime(self, datetime_str: str) -> Optional[datetime]:
@@ -208,43 +313,44 @@ class XMLTVParser:
         if not datetime_str:
             return None
 
-        try:
-            # XMLTV format: YYYYMMDDHHMMSS +TIMEZONE
-            if len(datetime_str) >= 14:
-                # Extract timezone if present
-                if "+" in datetime_str or "-" in datetime_str[-5:]:
-                    dt_part = datetime_str[:14]
-                    tz_part = datetime_str[14:].strip()
-                else:
-                    dt_part = datetime_str[:14]
-                    tz_part = None
-
-                # Parse the datetime part
-                dt = datetime.strptime(dt_part, "%Y%m%d%H%M%S")
-
-                # Add timezone if present
-                if tz_part:
-                    try:
-                        # Parse timezone offset
-                        sign = 1 if tz_part[0] == "+" else -1
-                        hours = int(tz_part[1:3])
-                        minutes = int(tz_part[3:5]) if len(tz_part) >= 5 else 0
-                        offset_minutes = sign * (hours * 60 + minutes)
-                        dt = dt.replace(
-                            tzinfo=timezone(datetime.timedelta(minutes=offset_minutes))
-                        )
-                    except (ValueError, IndexError):
-                        pass
-
-                return dt
-            else:
-                # Try generic parsing
+        if len(datetime_str) < 14:
+            # Try generic parsing
+            from dateutil import parser as date_parser
+
+            try:
                 return date_parser.parse(datetime_str)
+            except (ValueError, date_parser.ParserError):
+                print(f"Failed to parse datetime: {datetime_str}")
+                return None
 
-        except (ValueError, date_parser.ParserError):
+        # XMLTV format: YYYYMMDDHHMMSS +TIMEZONE, read by position
+        s = datetime_str
+        try:
+            dt = datetime(
+                int(s[0:4]),
+                int(s[4:6]),
+                int(s[6:8]),
+                int(s[8:10]),
+                int(s[10:12]),
+                int(s[12:14]),
+            )
+        except ValueError:
             print(f"Failed to parse datetime: {datetime_str}")
             return None
 
+        # Add timezone if present
+        tz_part = s[14:].strip()
+        if tz_part[:1] in ("+", "-"):
+            try:
+                sign = 1 if tz_part[0] == "+" else -1
+                hours = int(tz_part[1:3])
+                minutes = int(tz_part[3:5]) if len(tz_part) >= 5 else 0
+                dt = dt.replace(tzinfo=_timezone(sign * (hours * 60 + minutes)))
+            except ValueError:
+                pass
+
+        return dt
+
     def get_channel(self, channel_id: str) -> Optional[Dict]:
         """Get channel information by ID"""
         return self.channels.get(channel_id)
@@ -253,35 +359,20 @@ class XMLTVParser:
         self, channel_id: str, start_time: datetime = None, end_time: datetime = None
     ) -> List[Dict]:
         """Get programmes for a specific channel within time range"""
-        programmes = []
-
-        for programme in self.programmes:
-            if programme["channel"] != channel_id:
-                continue
-
-            prog_start = programme.get("start")
-            if not prog_start:
-                continue
-
-            # Apply time filters
-            if start_time and prog_start < start_time:
-                continue
-            if end_time and prog_start > end_time:
-                continue
+        programmes = self._by_channel.get(channel_id)
+        if not programmes:
+            return []
 
-            programmes.append(programme)
-
-        return sorted(programmes, key=lambda x: x.get("start", datetime.min))
+        # Programmes are sorted by start, so the time range is a slice
+        starts = self._channel_starts[channel_id]
+        low = bisect_left(starts, start_time.timestamp()) if start_time else 0
+        high = bisect_right(starts, end_time.timestamp()) if end_time else len(starts)
+        return programmes[low:high]
 
     def get_programmes_by_category(self, category: str) -> List[Dict]:
         """Get all programmes in a specific category"""
-        programmes = []
-
-        for programme in self.programmes:
-            if category in programme.get("categories", []):
-                programmes.append(programme)
-
-        return programmes
+        programmes = self.programmes
+        return [programmes[i] for i in self._by_category.get(category, [])]
 
     def get_current_programme(
         self, channel_id: str, current_time: datetime = None
@@ -290,18 +381,21 @@ class XMLTVParser:
         if not current_time:
             current_time = datetime.now(timezone.utc)
 
-        for programme in self.programmes:
-            if programme["channel"] != channel_id:
-                continue
-
-            start = programme.get("start")
-            stop = programme.get("stop")
-
-            if not start:
-                continue
+        programmes = self._by_channel.get(channel_id)
+        if not programmes:
+            return None
 
-            if start <= current_time and (not stop or current_time <= stop):
-                return programme
+        # Walk back from the latest programme that has started; once no earlier
+        # programme runs past now, none of them can still be airing
+        now = current_time.timestamp()
+        stops = self._channel_stops[channel_id]
+        max_stops = self._channel_max_stops[channel_id]
+        index = bisect_right(self._channel_starts[channel_id], now)
+        for i in range(index - 1, -1, -1):
+            if max_stops[i] < now:
+                break
+            if now <= stops[i]:
+                return programmes[i]
 
         return None
 
@@ -314,37 +408,29 @@ class XMLTVParser:
         if not search_in:
             search_in = ["titles", "descriptions", "categories"]
 
-        query = query.lower()
-        results = []
-
-        for programme in self.programmes:
-            match_found = False
-
-            # Search in titles
-            if "titles" in search_in:
-                for title in programme.get("titles", []):
-                    if query in title.get("text", "").lower():
-                        match_found = True
-                        break
-
-            # Search in descriptions
-            if not match_found and "descriptions" in search_in:
-                for desc in programme.get("descriptions", []):
-                    if query in desc.get("text", "").lower():
-                        match_found = True
-                        break
-
-            # Search in categories
-            if not match_found and "categories" in search_in:
-                for category in programme.get("categories", []):
-                    if query in category.lower():
-                        match_found = True
-                        break
-
-            if match_found:
-                results.append(programme)
-
-        return results
+        matches = set()
+        for field in search_in:
+            if field in _SEARCH_FIELDS:
+                index, rows = self._search_index(field)
+                matches.update(rows[i] for i in index.search(query))
+
+        programmes = self.programmes
+        return [programmes[i] for i in sorted(matches)]
+
+    def _search_index(self, field: str):
+        """Get a NameIndex over one text field and the programme row of each entry"""
+        cached = self._search_indexes.get(field)
+        if cached is None:
+            texts = []
+            rows = []
+            for row, programme in enumerate(self.programmes):
+                values = programme[field]
+                if values:
+                    # NUL keeps a query from matching across two values
+                    texts.append("\0".join(values))
+                    rows.append(row)
+            cached = self._search_indexes[field] = (NameIndex(texts), rows)
+        return cached
 
     def get_stats(self) -> Dict:
         """Get statistics about parsed EPG data"""
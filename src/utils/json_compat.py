@@ -0,0 +1,25 @@
+"""
+JSON helpers that use orjson when it is installed
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception whichever backend is active
+if orjson is not None:
+    loads = orjson.loads
+else:
+    loads = json.loads
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Serialize obj as UTF-8 JSON indented by two spaces"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,73 @@
+"""
+Search index for substring matching over large lists of names
+"""
+
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from typing import List, Optional, Sequence, Tuple
+
+
+class NameIndex:
+    """Lowercased names joined into one string, so a search is a C-level scan"""
+
+    def __init__(self, names: Sequence[str]):
+        lowered = [(name or "").lower().replace("\n", " ") for name in names]
+        self._names = lowered
+        self._joined = "\n".join(lowered)
+
+        # Offset in the joined string where each name starts
+        self._starts = []
+        offset = 0
+        for name in lowered:
+            self._starts.append(offset)
+            offset += len(name) + 1
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def search(self, query: str, within: Optional[List[int]] = None) -> List[int]:
+        """Get indices of names containing query, in their original order
+
+        Pass the matches of a shorter prefix of query as within to only
+        re-check those names instead of scanning everything.
+        """
+        query = query.lower()
+        if "\n" in query:
+            return []
+        if within is not None:
+            names = self._names
+            return [index for index in within if query in names[index]]
+        if not query:
+            return list(range(len(self._starts)))
+
+        starts = self._starts
+        find = self._joined.find
+        matches = []
+
+        position = find(query)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            matches.append(index)
+            # Resume at the next name so each name is reported once
+            if index + 1 >= len(starts):
+                break
+            position = find(query, starts[index + 1])
+
+        return matches
+
+    @cached_property
+    def _sorted(self) -> Tuple[List[str], List[int]]:
+        """Names in sorted order with their original indices, built on first use"""
+        pairs = sorted(zip(self._names, range(len(self._names))))
+        return [name for name, _ in pairs], [index for _, index in pairs]
+
+    def search_prefix(self, query: str) -> List[int]:
+        """Get indices of names starting with query, in their original order"""
+        query = query.lower()
+        if not query:
+            return list(range(len(self._starts)))
+
+        names, indices = self._sorted
+        low = bisect_left(names, query)
+        high = bisect_left(names, query + chr(0x10FFFF), low)
+        return sorted(indices[low:high])
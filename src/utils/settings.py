@@ -7,6 +7,17 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from utils.json_compat import dumps_indented
+
+
+def _write_json(path: Path, data: Any):
+    """Write data as indented JSON via a temp file so a crash cannot truncate it"""
+    tmp_path = Path(f'{path}.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps_indented(data))
+    os.replace(tmp_path, path)
+
+
 class Settings:
     def __init__(self):
         self.app_name = "IPyTV-Player"
@@ -51,6 +62,7 @@ class Settings:
         }
         
         self._settings = self.defaults.copy()
+        self._rebuild_flat()
         self.load_settings()
         
     def _get_settings_directory(self) -> Path:
@@ -80,9 +92,8 @@ class Settings:
     def save_settings(self):
         """Save settings to file"""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            _write_json(self.settings_file, self._settings)
+        except (TypeError, IOError) as e:
             print(f"Failed to save settings: {e}")
             
     def _merge_settings(self, loaded_settings: Dict):
@@ -97,18 +108,25 @@ class Settings:
             return result
             
         self._settings = merge_dict(self.defaults, loaded_settings)
+        self._rebuild_flat()
+        
+    def _rebuild_flat(self):
+        """Index every setting by its dotted key so get is a single dict lookup"""
+        flat = {}
+        
+        def walk(node: Dict, prefix: str):
+            for k, value in node.items():
+                key = f'{prefix}{k}'
+                flat[key] = value
+                if isinstance(value, dict):
+                    walk(value, f'{key}.')
+                    
+        walk(self._settings, '')
+        self._flat = flat
         
     def get(self, key: str, default: Any = None) -> Any:
         """Get setting value using dot notation (e.g., 'window.width')"""
-        keys = key.split('.')
-        value = self._settings
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key, default)
             
     def set(self, key: str, value: Any):
         """Set setting value using dot notation"""
@@ -123,6 +141,7 @@ class Settings:
             
         # Set the value
         setting[keys[-1]] = value
+        self._rebuild_flat()
         
     def get_credentials(self) -> Optional[Dict[str, str]]:
         """Load saved credentials"""
@@ -143,8 +162,7 @@ class Settings:
         }
         
         try:
-            with open(self.credentials_file, 'w', encoding='utf-8') as f:
-                json.dump(credentials, f, indent=2)
+            _write_json(self.credentials_file, credentials)
         except IOError as e:
             print(f"Failed to save credentials: {e}")
             
@@ -163,14 +181,14 @@ class Settings:
     def reset_to_defaults(self):
         """Reset all settings to defaults"""
         self._settings = self.defaults.copy()
+        self._rebuild_flat()
         self.save_settings()
         
     def export_settings(self, file_path: str):
         """Export settings to file"""
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            _write_json(Path(file_path), self._settings)
+        except (TypeError, IOError) as e:
             print(f"Failed to export settings: {e}")
             
     def import_settings(self, file_path: str):